@@ -0,0 +1,170 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# bcjr.py -- max-log-MAP (BCJR) decoder
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import numpy as np
+
+from typing import (
+    Final,
+    Optional,
+)
+
+from galois import GF2
+from numpy import ndarray
+
+from bit import (
+    packbits,
+    unpackbits,
+)
+from trellis import (
+    matrix2poly,
+    trellis,
+)
+
+# only this many steps of forward metrics are kept in memory at once
+_WINDOW: Final[int] = 1024
+
+# backward metrics of a window are trained over this multiple of the
+# constraint length past its end, enough for them to become reliable
+_WINDOW_MARGIN: Final[int] = 16
+
+
+class BCJR:
+    # log-likelihood ratios are ln(P(b = 1) / P(b = 0)) for both the coded
+    # bits going in and the decoded bits coming out
+    def __call__(
+        self,
+        x: ndarray,
+        length: Optional[ndarray] = None,
+    ) -> ndarray:
+        x = np.asarray(x, dtype=np.float64)
+
+        # the last axis is always one coded bit stream, as with Viterbi
+        assert length is not None or x.ndim < 2 or x.shape[-1] != self.n
+
+        x = x.reshape(x.shape[:-1] + (x.shape[-1] // self.n, self.n))
+
+        shape = x.shape[:-2]
+        steps = x.shape[-2]
+
+        if length is None:
+            length = steps * self.n
+
+        length = np.broadcast_to(length, shape).reshape(-1)
+
+        assert np.all(length % self.n == 0)
+        assert np.all(length <= steps * self.n)
+
+        branch_metric = x.reshape((len(length),) + x.shape[-2:]) @ self._bits.T
+
+        y = self._decode(branch_metric, length // self.n)
+
+        return y.reshape(shape + y.shape[-1:])
+
+    def __init__(
+        self,
+        generator_matrix: GF2,
+        window: int = _WINDOW,
+        margin: Optional[int] = None,
+    ) -> None:
+        self.generator_matrix = generator_matrix
+
+        self.k = k = generator_matrix.shape[0]
+        self.n = n = generator_matrix.shape[1]
+
+        self.states = 1 << (k - 1)
+
+        if margin is None:
+            margin = _WINDOW_MARGIN * k
+
+        assert window > 0
+        assert margin >= 0
+
+        self.window = window
+        self.margin = margin
+
+        t = trellis(*matrix2poly(generator_matrix))
+
+        self._previous = t.previous
+        self._symbol = t.symbol
+
+        # the transitions out of each state, indexed by the input bit
+        self._next = t.branch.T
+        self._next_symbol = packbits(GF2(t.expected.reshape(-1, n)))
+        self._next_symbol = self._next_symbol.reshape(2, self.states).T
+
+        symbols = np.arange(1 << n, dtype=np.uint8)
+
+        self._bits = np.array(unpackbits(symbols, count=n), dtype=np.float64)
+
+    def _backward_step(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        path_metric = branch_metric[:, self._next_symbol]
+        path_metric += metric[:, self._next]
+
+        metric = np.maximum(path_metric[..., 0], path_metric[..., 1])
+
+        return path_metric, metric - np.max(metric, axis=-1, keepdims=True)
+
+    def _decode(self, branch_metric: ndarray, steps: ndarray) -> ndarray:
+        batch = len(branch_metric)
+
+        y = np.zeros(branch_metric.shape[:-1])
+
+        terminal = np.full(self.states, -np.inf)
+        terminal[0] = 0
+
+        alpha = np.broadcast_to(terminal, (batch, self.states))
+
+        for start in range(0, branch_metric.shape[-2], self.window):
+            stop = min(start + self.window, branch_metric.shape[-2])
+
+            alphas = np.empty((stop - start, batch, self.states))
+
+            for i in range(start, stop):
+                alphas[i - start] = alpha
+
+                alpha = self._forward_step(branch_metric[:, i], alpha)
+
+            train = min(stop + self.margin, branch_metric.shape[-2])
+
+            # training starts from every state being equally likely, every
+            # row is forced into the zero state at its terminating step
+            beta = np.zeros((batch, self.states))
+
+            for i in range(train - 1, start - 1, -1):
+                beta = np.where((steps == i + 1)[:, None], terminal, beta)
+
+                path_metric, beta = self._backward_step(
+                    branch_metric[:, i],
+                    beta,
+                )
+
+                if i >= stop:
+                    continue
+
+                path_metric += alphas[i - start, :, :, None]
+
+                path_metric = np.max(path_metric, axis=-2)
+
+                y[:, i] = path_metric[:, 1] - path_metric[:, 0]
+
+        y[np.arange(y.shape[-1]) >= steps[:, None]] = 0
+
+        return y
+
+    def _forward_step(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> ndarray:
+        path_metric = metric[:, self._previous]
+        path_metric += branch_metric[:, self._symbol]
+
+        metric = np.maximum(path_metric[..., 0], path_metric[..., 1])
+
+        return metric - np.max(metric, axis=-1, keepdims=True)
@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# bcjr_test.py -- max-log-MAP (BCJR) decoder test
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import itertools
+
+import numpy as np
+import pytest
+
+from galois import GF2
+from numpy.random import Generator
+
+from bcjr import BCJR
+from ppdu import (
+    ConvolutionalEncoder,
+    GENERATOR_CONSTRAINT_LENGTH,
+    GENERATOR_POLYNOMIALS,
+)
+from trellis import poly2matrix
+
+
+def test_bcjr(rng: Generator, random_count: int) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random((4, random_count), seed=rng)
+    x[:, -(k - 1) :] = 0
+
+    y = ConvolutionalEncoder(G)(x.flatten()).reshape(len(x), -1)
+
+    llr = 2 * (2.0 * np.array(y) - 1) + rng.normal(0, 1, y.shape)
+
+    z = BCJR(G, window=random_count)(llr)
+
+    assert np.all((z > 0) == (x == 1))
+    assert np.all(z[:, -(k - 1) :] == -np.inf)
+
+    assert np.all(BCJR(G, window=random_count // 8)(llr) == z)
+
+    length = 2 * rng.integers(0, x.shape[-1] + 1, len(x))
+
+    z = BCJR(G, window=random_count // 8)(llr, length)
+
+    for z_i, llr_i, length_i in zip(z, llr, length):
+        if length_i:
+            assert np.all(z_i[: length_i // 2] == BCJR(G)(llr_i[:length_i]))
+
+        assert np.all(z_i[length_i // 2 :] == 0)
+
+    # a batch of single step codewords, not an encoder (steps, n) output
+    z = BCJR(G)(llr[:, :2], np.full(len(llr), 2))
+
+    assert z.shape == (len(llr), 1)
+
+    for z_i, llr_i in zip(z, llr):
+        assert np.all(z_i == BCJR(G)(llr_i[:2]))
+
+    with pytest.raises(AssertionError):
+        BCJR(G)(llr[:, :2])
+
+
+def test_bcjr_exhaustive(rng: Generator) -> None:
+    G = poly2matrix([0b111, 0b101], 3)
+
+    c = ConvolutionalEncoder(G)
+
+    llr = rng.normal(0, 2, 16)
+
+    metric = np.full((2, 8), -np.inf)
+
+    for u in itertools.product([0, 1], repeat=6):
+        x = GF2(list(u) + [0, 0])
+
+        y = np.array(c(x).flatten())
+
+        metric[x, np.arange(len(x))] = np.maximum(
+            metric[x, np.arange(len(x))],
+            y @ llr,
+        )
+
+    assert np.allclose(BCJR(G)(llr), metric[1] - metric[0])
@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# benchmark.py -- IEEE Std 802.11a-1999 benchmarks
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+import ofdm
+import ppdu
+
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from functools import partial
+from time import perf_counter
+from typing import (
+    Callable,
+    Final,
+)
+
+from galois import GF2
+from numpy.random import Generator
+
+from ofdm import (
+    FFTBackend,
+    MatrixFFTBackend,
+    SUBCARRIERS_DATA,
+    ScipyFFTBackend,
+)
+from ppdu import (
+    ConvolutionalEncoder,
+    GENERATOR_CONSTRAINT_LENGTH,
+    GENERATOR_POLYNOMIALS,
+    Puncturer,
+    SCRAMBLER_SERVICE_BITS,
+    Signal,
+)
+from trellis import poly2matrix
+from viterbi import (
+    BitslicedViterbi,
+    ParallelViterbi,
+    Radix4Viterbi,
+    SoftViterbi,
+    Viterbi,
+)
+from wifi import (
+    Rx,
+    Tx,
+    _calculate_data_bits,
+)
+
+RATES: Final[list[int]] = [6, 9, 12, 18, 24, 36, 48, 54]
+
+
+def _coded_bits(
+    rng: Generator,
+    bytes: int,
+    rate: int,
+) -> tuple[GF2, GF2, np.ndarray]:
+    rate_parameter = ppdu.rate_parameter(rate)
+
+    n_data = _calculate_data_bits(bytes, rate_parameter.dbps)
+
+    generator_matrix = poly2matrix(
+        GENERATOR_POLYNOMIALS,
+        GENERATOR_CONSTRAINT_LENGTH,
+    )
+    encoder = ConvolutionalEncoder(generator_matrix)
+    puncturer = Puncturer(rate_parameter.coding_rate)
+
+    x = GF2.Random(n_data, seed=rng)
+    x[-GENERATOR_CONSTRAINT_LENGTH + 1 :] = 0
+
+    y = puncturer.forward(encoder(x).flatten())
+    y, valid = puncturer.reverse(y)
+
+    return x, y, valid
+
+
+def _measure(f: Callable[[], object], iterations: int) -> tuple[float, int]:
+    tracemalloc.start()
+
+    f()
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    start = perf_counter()
+
+    for _ in range(iterations):
+        f()
+
+    elapsed = perf_counter() - start
+
+    return iterations / elapsed, peak
+
+
+def _pipeline_stages(
+    rng: Generator,
+    bytes: int,
+    rate: int,
+    gf2: bool,
+) -> list[tuple[str, Callable[[], object]]]:
+    tx = Tx(rng=rng, gf2=gf2)
+    rx = Rx(gf2=gf2)
+
+    x = rng.integers(0, 1 << 8, bytes, dtype=np.uint8)
+
+    tx._update_state(x, rate)
+
+    encoded = tx._encode(x)
+    scrambled = tx._scramble(encoded)
+    punctured = tx._apply_punctured_encoder(scrambled)
+    interleaved = tx._interleave(punctured)
+    modulated = tx._modulate(interleaved)
+
+    rx._update_state(Signal(rate, bytes))
+
+    demodulated = rx._demodulate(modulated)
+    deinterleaved, valid = rx._deinterleave_depuncture(demodulated)
+    decoded = rx._apply_viterbi_decoder(deinterleaved, valid)
+    state = rx._estimate_scrambler_state(decoded[:SCRAMBLER_SERVICE_BITS])
+    descrambled = rx._descramble(decoded, state)
+
+    assert np.all(rx._decode(descrambled) == x)
+
+    return [
+        ("Tx encode", lambda: tx._encode(x)),
+        ("Tx scramble", lambda: tx._scramble(encoded)),
+        (
+            "Tx punctured encoder",
+            lambda: tx._apply_punctured_encoder(scrambled),
+        ),
+        ("Tx interleave", lambda: tx._interleave(punctured)),
+        ("Tx modulate", lambda: tx._modulate(interleaved)),
+        ("Rx demodulate", lambda: rx._demodulate(modulated)),
+        (
+            "Rx deinterleave depuncture",
+            lambda: rx._deinterleave_depuncture(demodulated),
+        ),
+        (
+            "Rx viterbi",
+            lambda: rx._apply_viterbi_decoder(deinterleaved, valid),
+        ),
+        ("Rx descramble", lambda: rx._descramble(decoded, state)),
+        ("Rx decode", lambda: rx._decode(descrambled)),
+    ]
+
+
+def _print_table(header: list[str], rows: list[list[str]]) -> None:
+    widths = [
+        max(len(row[i]) for row in [header] + rows) for i in range(len(header))
+    ]
+
+    separator = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+
+    def line(row: list[str]) -> str:
+        return (
+            "| " + " | ".join(c.ljust(w) for c, w in zip(row, widths)) + " |"
+        )
+
+    print(separator)
+    print(line(header))
+    print(separator)
+
+    for row in rows:
+        print(line(row))
+
+    print(separator)
+
+
+def fft(args: Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+
+    workers = os.cpu_count() if args.workers is None else args.workers
+
+    backends = [
+        ("numpy", FFTBackend()),
+        ("scipy", ScipyFFTBackend(workers=1)),
+        (f"scipy x{workers}", ScipyFFTBackend(workers=workers)),
+        ("matrix", MatrixFFTBackend()),
+    ]
+
+    rows = []
+
+    for symbols in args.symbols:
+        for dtype in [np.complex64, np.complex128]:
+            shape = (symbols, SUBCARRIERS_DATA)
+
+            d = rng.standard_normal(shape) + 1j * rng.standard_normal(shape)
+            d = d.astype(dtype)
+
+            row = [str(symbols), np.dtype(dtype).name]
+
+            for _, backend in backends:
+
+                def round_trip(
+                    d: np.ndarray,
+                    backend: FFTBackend,
+                ) -> np.ndarray:
+                    s = ofdm.modulate(d, backend=backend)
+
+                    return ofdm.demodulate(s, backend=backend)
+
+                assert np.allclose(round_trip(d, backend), d, atol=1e-4)
+
+                calls, _ = _measure(
+                    partial(round_trip, d, backend),
+                    args.iterations,
+                )
+
+                row.append(f"{calls * symbols / 1e6:.3f}")
+
+            rows.append(row)
+
+    _print_table(
+        ["Symbols", "Precision"]
+        + [f"{name} [Msym/s]" for name, _ in backends],
+        rows,
+    )
+
+
+def latency(args: Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+
+    generator_matrix = poly2matrix(
+        GENERATOR_POLYNOMIALS,
+        GENERATOR_CONSTRAINT_LENGTH,
+    )
+    decoder = Viterbi(generator_matrix)
+    traceback_decoder = Viterbi(generator_matrix, register_exchange=0)
+    encoder = ConvolutionalEncoder(generator_matrix)
+
+    rows = []
+
+    for steps in args.steps:
+        x = GF2.Random(steps, seed=rng)
+        x[-GENERATOR_CONSTRAINT_LENGTH + 1 :] = 0
+
+        y = encoder(x).flatten()
+
+        assert np.all(decoder(y) == x)
+
+        packets, _ = _measure(partial(decoder, y), args.iterations)
+        traceback_packets, _ = _measure(
+            partial(traceback_decoder, y),
+            args.iterations,
+        )
+
+        rows.append(
+            [
+                str(steps),
+                "yes" if steps <= decoder.register_exchange else "no",
+                f"{1e6 / traceback_packets:.1f}",
+                f"{1e6 / packets:.1f}",
+            ]
+        )
+
+    _print_table(
+        ["Steps", "Register Exchange", "Traceback [us]", "Latency [us]"],
+        rows,
+    )
+
+
+def parallel(args: Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+
+    generator_matrix = poly2matrix(
+        GENERATOR_POLYNOMIALS,
+        GENERATOR_CONSTRAINT_LENGTH,
+    )
+    decoder = Viterbi(generator_matrix)
+
+    workers = args.workers
+
+    if workers is None:
+        workers = [1 << i for i in range(os.cpu_count().bit_length())]
+
+    rows = []
+
+    for rate in RATES:
+        _, y, valid = _coded_bits(rng, args.bytes, rate)
+
+        bit_flips = rng.choice(np.flatnonzero(valid), args.errors)
+
+        y[bit_flips] ^= 1
+
+        serial, _ = _measure(partial(decoder, y, valid), args.iterations)
+
+        expected = decoder(y, valid)
+
+        for workers_i in workers:
+            with ParallelViterbi(
+                generator_matrix,
+                processes=args.processes,
+                workers=workers_i,
+            ) as parallel_decoder:
+                assert np.all(parallel_decoder(y, valid) == expected)
+
+                packets, _ = _measure(
+                    partial(parallel_decoder, y, valid),
+                    args.iterations,
+                )
+
+            rows.append(
+                [
+                    str(rate),
+                    str(workers_i),
+                    f"{serial:.2f}",
+                    f"{packets:.2f}",
+                    f"{packets / serial:.2f}",
+                ]
+            )
+
+    _print_table(
+        ["Rate", "Workers", "Serial Packets/s", "Packets/s", "Speedup"],
+        rows,
+    )
+
+
+def pipeline(args: Namespace) -> None:
+    rows = []
+
+    for rate in RATES:
+        stages = _pipeline_stages(
+            np.random.default_rng(args.seed),
+            args.bytes,
+            rate,
+            True,
+        )
+        fast_stages = _pipeline_stages(
+            np.random.default_rng(args.seed),
+            args.bytes,
+            rate,
+            False,
+        )
+
+        for (stage, f), (_, fast_f) in zip(stages, fast_stages):
+            calls, _ = _measure(f, args.iterations)
+            fast_calls, _ = _measure(fast_f, args.iterations)
+
+            rows.append(
+                [
+                    str(rate),
+                    stage,
+                    f"{1e6 / calls:.1f}",
+                    f"{1e6 / fast_calls:.1f}",
+                    f"{fast_calls / calls:.2f}",
+                ]
+            )
+
+    _print_table(
+        ["Rate", "Stage", "GF2 [us]", "uint8 [us]", "Speedup"],
+        rows,
+    )
+
+
+def viterbi(args: Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+
+    generator_matrix = poly2matrix(
+        GENERATOR_POLYNOMIALS,
+        GENERATOR_CONSTRAINT_LENGTH,
+    )
+    decoder = Viterbi(generator_matrix)
+    bitsliced_decoder = BitslicedViterbi(generator_matrix)
+    radix4_decoder = Radix4Viterbi(generator_matrix)
+    soft_decoder = SoftViterbi(generator_matrix)
+
+    rows = []
+
+    for rate in RATES:
+        x, y, valid = _coded_bits(rng, args.bytes, rate)
+
+        llr = (2.0 * np.array(y) - 1) * valid
+
+        assert np.all(decoder(y, valid) == x)
+        assert np.all(bitsliced_decoder(y, valid) == x)
+        assert np.all(radix4_decoder(y, valid) == x)
+        assert np.all(soft_decoder(llr) == x)
+
+        y = GF2(np.broadcast_to(y, (args.batch,) + y.shape))
+        valid = np.broadcast_to(valid, y.shape)
+        llr = np.broadcast_to(llr, y.shape)
+
+        packets, peak = _measure(partial(decoder, y, valid), args.iterations)
+        packets *= args.batch
+
+        bitsliced_packets, _ = _measure(
+            partial(bitsliced_decoder, y, valid),
+            args.iterations,
+        )
+        bitsliced_packets *= args.batch
+
+        radix4_packets, _ = _measure(
+            partial(radix4_decoder, y, valid),
+            args.iterations,
+        )
+        radix4_packets *= args.batch
+
+        soft_packets, soft_peak = _measure(
+            partial(soft_decoder, llr),
+            args.iterations,
+        )
+        soft_packets *= args.batch
+
+        steps = len(x) + 1
+        dense = steps * decoder.n * decoder.states * decoder.states * 8
+        dense *= args.batch
+
+        rows.append(
+            [
+                str(rate),
+                str(len(x)),
+                f"{dense / 2**20:.1f}",
+                f"{peak / 2**20:.3f}",
+                f"{packets:.2f}",
+                f"{bitsliced_packets:.2f}",
+                f"{radix4_packets:.2f}",
+                f"{soft_peak / 2**20:.3f}",
+                f"{soft_packets:.2f}",
+            ]
+        )
+
+    _print_table(
+        [
+            "Rate",
+            "Steps",
+            "Dense [MiB]",
+            "Peak [MiB]",
+            "Packets/s",
+            "Bit-sliced Packets/s",
+            "Radix-4 Packets/s",
+            "Soft Peak [MiB]",
+            "Soft Packets/s",
+        ],
+        rows,
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser()
+
+    parser.add_argument(
+        "--seed",
+        default=0x2A6D5C11,
+        type=int,
+    )
+
+    subparsers = parser.add_subparsers(required=True)
+
+    parser_fft = subparsers.add_parser("fft")
+    parser_fft.set_defaults(benchmark=fft)
+    parser_fft.add_argument(
+        "-i",
+        "--iterations",
+        default=256,
+        type=int,
+    )
+    parser_fft.add_argument(
+        "-s",
+        "--symbols",
+        default=[1, 16, 256, 4096],
+        nargs="+",
+        type=int,
+    )
+    parser_fft.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+    )
+
+    parser_latency = subparsers.add_parser("latency")
+    parser_latency.set_defaults(benchmark=latency)
+    parser_latency.add_argument(
+        "-i",
+        "--iterations",
+        default=256,
+        type=int,
+    )
+    parser_latency.add_argument(
+        "-s",
+        "--steps",
+        default=[24, 32, 48, 96],
+        nargs="+",
+        type=int,
+    )
+
+    parser_parallel = subparsers.add_parser("parallel")
+    parser_parallel.set_defaults(benchmark=parallel)
+    parser_parallel.add_argument(
+        "-b",
+        "--bytes",
+        default=4095,
+        type=int,
+    )
+    parser_parallel.add_argument(
+        "-e",
+        "--errors",
+        default=64,
+        type=int,
+    )
+    parser_parallel.add_argument(
+        "-i",
+        "--iterations",
+        default=2,
+        type=int,
+    )
+    parser_parallel.add_argument(
+        "--processes",
+        action="store_true",
+    )
+    parser_parallel.add_argument(
+        "-w",
+        "--workers",
+        nargs="+",
+        type=int,
+    )
+
+    parser_pipeline = subparsers.add_parser("pipeline")
+    parser_pipeline.set_defaults(benchmark=pipeline)
+    parser_pipeline.add_argument(
+        "-b",
+        "--bytes",
+        default=1500,
+        type=int,
+    )
+    parser_pipeline.add_argument(
+        "-i",
+        "--iterations",
+        default=64,
+        type=int,
+    )
+
+    parser_viterbi = subparsers.add_parser("viterbi")
+    parser_viterbi.set_defaults(benchmark=viterbi)
+    parser_viterbi.add_argument(
+        "-B",
+        "--batch",
+        default=1,
+        type=int,
+    )
+    parser_viterbi.add_argument(
+        "-b",
+        "--bytes",
+        default=4095,
+        type=int,
+    )
+    parser_viterbi.add_argument(
+        "-i",
+        "--iterations",
+        default=4,
+        type=int,
+    )
+
+    args = parser.parse_args()
+
+    args.benchmark(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
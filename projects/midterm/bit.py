@@ -5,12 +5,162 @@
 
 import numpy as np
 
-from typing import Final
+from typing import (
+    Final,
+    Optional,
+)
 
 from galois import GF2
+from galois.typing import ArrayLike
 from numpy import ndarray
 
 _BITORDER: Final[str] = "little"
+_BYTE_BITS: Final[int] = 8
+
+_WORD_DTYPE: Final[str] = "<u8"
+
+
+class BitVector:
+    # bits are packed least significant first into little-endian words, bits
+    # past the length of the last word are always kept clear
+    word_bits: Final[int] = 64
+
+    def __getitem__(self, key: slice) -> "BitVector":
+        start, stop, step = key.indices(self.length)
+
+        assert step == 1
+
+        length = max(stop - start, 0)
+
+        words = (self >> start).words[..., : -(-length // self.word_bits)]
+
+        return BitVector(words, length)
+
+    def __init__(self, words: ndarray, length: int) -> None:
+        words = np.asarray(words, dtype=_WORD_DTYPE)
+
+        assert length >= 0
+        assert words.shape[-1] == -(-length // self.word_bits)
+
+        tail = length % self.word_bits
+
+        if tail and np.any(words[..., -1] >> tail):
+            words = words.copy()
+            words[..., -1] &= (1 << tail) - 1
+
+        self.words = words
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __lshift__(self, shift: int) -> "BitVector":
+        assert shift >= 0
+
+        words, bits = divmod(min(shift, self.length), self.word_bits)
+
+        x = self._pad(words + 1, 0)
+        x = x[..., : self.words.shape[-1] + 1]
+
+        y = x[..., 1:] << bits
+
+        if bits:
+            y |= x[..., :-1] >> (self.word_bits - bits)
+
+        return BitVector(y, self.length)
+
+    def __rshift__(self, shift: int) -> "BitVector":
+        assert shift >= 0
+
+        words, bits = divmod(min(shift, self.length), self.word_bits)
+
+        x = self._pad(0, words + 1)
+        x = x[..., words:]
+
+        y = x[..., :-1] >> bits
+
+        if bits:
+            y |= x[..., 1:] << (self.word_bits - bits)
+
+        return BitVector(y, self.length)
+
+    def __xor__(self, other: "BitVector") -> "BitVector":
+        assert self.length == other.length
+
+        return BitVector(self.words ^ other.words, self.length)
+
+    def _pad(self, before: int, after: int) -> ndarray:
+        return np.pad(
+            self.words,
+            [(0, 0)] * (self.words.ndim - 1) + [(before, after)],
+        )
+
+    def count(self) -> ndarray:
+        return np.sum(np.bitwise_count(self.words), axis=-1, dtype=np.int64)
+
+    @classmethod
+    def from_bits(cls, x: ArrayLike) -> "BitVector":
+        length = x.shape[-1]
+
+        x = np.packbits(np.asarray(x), axis=-1, bitorder=_BITORDER)
+
+        return cls.from_bytes(x, length)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        x: ndarray,
+        length: Optional[int] = None,
+    ) -> "BitVector":
+        if length is None:
+            length = _BYTE_BITS * x.shape[-1]
+
+        word_bytes = cls.word_bits // _BYTE_BITS
+
+        x = np.asarray(x, dtype=np.uint8)
+        x = np.pad(
+            x,
+            [(0, 0)] * (x.ndim - 1) + [(0, -x.shape[-1] % word_bytes)],
+        )
+
+        x = x.view(_WORD_DTYPE)
+
+        return cls(x[..., : -(-length // cls.word_bits)], length)
+
+    def to_bits(self, *, gf2: bool = True) -> ArrayLike:
+        x = np.unpackbits(
+            self.words.view(np.uint8),
+            axis=-1,
+            count=self.length,
+            bitorder=_BITORDER,
+        )
+
+        return bits(x, gf2=gf2)
+
+    def to_bytes(self) -> ndarray:
+        x = self.words.view(np.uint8)
+
+        return x[..., : -(-self.length // _BYTE_BITS)]
+
+
+def bits(x: ArrayLike, *, gf2: bool = True) -> ArrayLike:
+    # galois validates and dispatches every operation on a field array, plain
+    # arrays skip that overhead for bits that are already known to be 0 or 1
+    if not gf2:
+        return np.asarray(x, dtype=np.uint8)
+
+    if isinstance(x, GF2):
+        return x
+
+    return GF2(x)
+
+
+def bits_like(x: ndarray, like: ArrayLike) -> ArrayLike:
+    # results only go back into the field when their input came from it
+    if isinstance(like, GF2):
+        return GF2(x)
+
+    return x
 
 
 def packbits(x: GF2) -> ndarray:
@@ -21,10 +171,12 @@ def packbits(x: GF2) -> ndarray:
     return x.reshape(shape)
 
 
-def unpackbits(x: ndarray, *, count: int = 8) -> GF2:
+def unpackbits(x: ndarray, *, count: int = 8, gf2: bool = True) -> ArrayLike:
     assert count >= 1
     assert count <= 8
 
     x = x.reshape(x.shape + (1,))
 
-    return GF2(np.unpackbits(x, axis=-1, count=count, bitorder=_BITORDER))
+    x = np.unpackbits(x, axis=-1, count=count, bitorder=_BITORDER)
+
+    return bits(x, gf2=gf2)
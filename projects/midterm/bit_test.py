@@ -11,6 +11,7 @@ from numpy.random import Generator
 from pytest import FixtureRequest
 
 from bit import (
+    BitVector,
     packbits,
     unpackbits,
 )
@@ -26,6 +27,39 @@ def values(rng: Generator, random_count: int) -> ndarray:
     return rng.integers(0, 9, random_count, dtype=np.uint8)
 
 
+@pytest.mark.parametrize("count", [0, 1, 63, 64, 65, 200])
+def test_bit_vector(rng: Generator, count: int) -> None:
+    x = rng.integers(0, 2, (3, count), dtype=np.uint8)
+    y = rng.integers(0, 2, x.shape, dtype=np.uint8)
+
+    v = BitVector.from_bits(x)
+
+    assert len(v) == count
+    assert np.all(v.to_bits() == x)
+    assert np.all(v.to_bytes() == np.packbits(x, axis=-1, bitorder="little"))
+    assert np.all(v.count() == np.sum(x, axis=-1))
+
+    assert np.all((v ^ BitVector.from_bits(y)).to_bits() == x ^ y)
+
+    for shift in [0, 1, 63, 64, 65, count]:
+        shifted = np.zeros_like(x)
+        shifted[:, shift:] = x[:, : max(count - shift, 0)]
+
+        assert np.all((v << shift).to_bits() == shifted)
+
+        shifted = np.zeros_like(x)
+        shifted[:, : max(count - shift, 0)] = x[:, shift:]
+
+        assert np.all((v >> shift).to_bits() == shifted)
+
+    for start, stop in [(0, count), (3, count - 2), (64, count), (5, 70)]:
+        assert np.all(v[start:stop].to_bits() == x[:, start:stop])
+
+    w = BitVector.from_bytes(v.to_bytes(), count)
+
+    assert np.all(w.words == v.words)
+
+
 @pytest.mark.parametrize("shape", [(), (1,), (1, 1)])
 def test_packing(values: ndarray, count: int, shape: tuple[int, ...]) -> None:
     values = values.reshape(shape + values.shape)
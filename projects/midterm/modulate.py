@@ -6,9 +6,14 @@
 import numpy as np
 
 from dataclasses import dataclass
-from typing import Final
+from functools import cache
+from typing import (
+    Final,
+    Optional,
+)
 
 from numpy import ndarray
+from numpy.typing import ArrayLike
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -128,13 +133,63 @@ _MAPPING: Final[dict[int, _Mapping]] = {
 }
 
 
-def _decode_component(x: ndarray, mapping: _Mapping) -> ndarray:
+@cache
+def _constellation(rate: int) -> ndarray:
+    mapping = _get_mapping(rate)
+
+    # every byte maps onto a point, bits past the symbol are ignored
+    x = np.arange(1 << 8)
+
+    i = x & mapping.mask
+    q = (x >> mapping.shift) & mapping.mask
+
+    d = (mapping.encode[i] + 1j * mapping.encode[q]) * mapping.k_mod
+
+    if mapping.real:
+        d = d.real
+
+    d.flags.writeable = False
+
+    return d
+
+
+@cache
+def _decision_table(rate: int) -> ndarray:
+    mapping = _get_mapping(rate)
+
     mask = mapping.mask
 
-    index = np.clip(np.rint(x), a_min=-mask, a_max=mask)
-    index = (index + mask).astype(np.uint8) // 2
+    # components are truncated to integers in units of half a level spacing,
+    # level j is decided on strictly past 4j - 2 mask - 1 of them
+    thresholds = 4 * np.arange(1, mask + 1) - 2 * mask - 1
+
+    # truncation toward zero never straddles an odd threshold, so every
+    # integer stands for the values it was truncated from
+    t = np.arange(-2 * mask, 2 * mask + 1)
+    t = t + np.sign(t) / 2
+
+    levels = np.sum(t[:, None] > thresholds, axis=-1)
+
+    table = mapping.decode[levels]
+
+    if not mapping.real:
+        table = table[:, None] | (table << mapping.shift)
+
+    table.flags.writeable = False
+
+    return table
 
-    return mapping.decode[index]
+
+def _decode_component_soft(x: ndarray, rate: int) -> ndarray:
+    table = _soft_decode_table(rate)
+
+    count = len(table) // 2
+
+    region = np.clip(np.floor(x), -count, count - 1).astype(np.intp) + count
+
+    table = table[region]
+
+    return x[..., None] * table[..., 0] + table[..., 1]
 
 
 def _get_mapping(rate: int) -> _Mapping:
@@ -147,29 +202,104 @@ def _get_mapping(rate: int) -> _Mapping:
     return mapping
 
 
-def demodulate(d: ndarray, rate: int) -> ndarray:
+def _quantize(x: ndarray, scale: float, radius: int) -> ndarray:
+    # saturate before the integer cast, huge or infinite components would
+    # otherwise wrap around into a decision on the wrong side, fmin also
+    # turns a nan that carries no decision into the positive limit
+    y = np.multiply(x, scale)
+
+    np.fmin(y, radius, out=y)
+    np.fmax(y, -radius, out=y)
+
+    y = y.astype(np.int32)
+    y += radius
+
+    return y
+
+
+@cache
+def _soft_decode_table(rate: int) -> ndarray:
     mapping = _get_mapping(rate)
 
-    d = d / mapping.k_mod
+    levels = mapping.encode.astype(np.float64)
+    labels = np.arange(len(levels))
+    bits = np.arange(max(mapping.shift, 1))
 
-    if mapping.real:
-        d = d.real
+    # levels are odd integers, so the nearest level among any subset of them
+    # can only change at an integer
+    center = np.arange(-len(levels), len(levels)) + 0.5
+
+    ones = ((labels >> bits[:, None]) & 1).astype(np.bool)
+
+    distance = np.square(center[:, None, None] - levels)
 
-    i = _decode_component(d.real, mapping)
-    q = _decode_component(d.imag, mapping)
+    zero = levels[np.argmin(np.where(ones, np.inf, distance), axis=-1)]
+    one = levels[np.argmin(np.where(ones, distance, np.inf), axis=-1)]
 
-    return (q << mapping.shift) | i
+    # (x - zero)^2 - (x - one)^2 is linear in x within each interval
+    table = np.stack([2 * (one - zero), np.square(zero) - np.square(one)], -1)
+    table.flags.writeable = False
 
+    return table
 
-def modulate(x: ndarray, rate: int) -> ndarray:
+
+def demodulate(
+    d: ndarray,
+    rate: int,
+    out: Optional[ndarray] = None,
+) -> ndarray:
     mapping = _get_mapping(rate)
 
-    i = x & mapping.mask
-    q = (x >> mapping.shift) & mapping.mask
+    table = _decision_table(rate)
 
-    d = (mapping.encode[i] + 1j * mapping.encode[q]) * mapping.k_mod
+    radius = len(table) // 2
+    scale = 2 / mapping.k_mod
 
-    if mapping.real:
-        d = d.real
+    index = _quantize(d.real, scale, radius)
 
-    return d
+    if not mapping.real:
+        index *= len(table)
+        index += _quantize(d.imag, scale, radius)
+
+    return np.take(table, index, out=out)
+
+
+def demodulate_soft(
+    d: ndarray,
+    rate: int,
+    weight: Optional[ArrayLike] = None,
+) -> ndarray:
+    mapping = _get_mapping(rate)
+
+    d = d / mapping.k_mod
+
+    # max-log ln(P(b = 1) / P(b = 0)) of every label bit, least significant
+    # first, scaled by a per-subcarrier weight such as |H|^2 / N0
+    llr = _decode_component_soft(d.real, rate)
+
+    if not mapping.real:
+        llr = np.concatenate(
+            [llr, _decode_component_soft(d.imag, rate)],
+            axis=-1,
+        )
+
+    llr *= mapping.k_mod**2
+
+    if weight is not None:
+        llr *= np.asarray(weight)[..., None]
+
+    return llr
+
+
+def modulate(
+    x: ndarray,
+    rate: int,
+    out: Optional[ndarray] = None,
+) -> ndarray:
+    table = _constellation(rate)
+
+    # casting the table is cheaper than casting every symbol taken from it
+    if out is not None:
+        table = table.astype(out.dtype, copy=False)
+
+    return np.take(table, x, out=out)
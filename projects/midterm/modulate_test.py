@@ -6,11 +6,16 @@
 import numpy as np
 import pytest
 
+from numpy.random import Generator
+
+from bit import unpackbits
 from conftest import Data
 from modulate import (
     demodulate,
+    demodulate_soft,
     modulate,
 )
+from ppdu import rate_parameter
 
 
 @pytest.mark.parametrize("disturbance", [0, 0.1, 0.2])
@@ -20,3 +25,69 @@ def test_modulation(data: Data, disturbance: int) -> None:
     x = demodulate(r, data.rate)
 
     assert np.all(x == data.bits)
+
+
+def test_modulation_saturation(rate: int) -> None:
+    component = np.array([-np.inf, -1e10, -4.0, 4.0, 1e10, np.inf])
+
+    i, q = np.meshgrid(component, component)
+
+    # built part by part, 1j * inf would put a nan into the real part
+    d = np.empty(i.shape, dtype=np.complex128)
+    d.real = i
+    d.imag = q
+
+    # past the outermost points every magnitude decides the same way
+    expected = demodulate(np.sign(d.real) * 4 + 1j * np.sign(d.imag) * 4, rate)
+
+    with np.errstate(all="raise"):
+        assert np.all(demodulate(d, rate) == expected)
+        assert np.all(demodulate(d.astype(np.complex64), rate) == expected)
+
+        x = demodulate(
+            np.array([complex(np.nan, 0), complex(0, np.nan)]), rate
+        )
+
+    assert np.all(x == demodulate(np.array([4 + 0j, 4j]), rate))
+
+
+def test_modulation_out(data: Data) -> None:
+    d = modulate(data.bits, data.rate)
+
+    out = np.empty_like(d)
+
+    assert modulate(data.bits, data.rate, out=out) is out
+    assert np.all(out == d)
+
+    x = np.empty_like(data.bits)
+
+    assert demodulate(d, data.rate, out=x) is x
+    assert np.all(x == data.bits)
+
+
+def test_soft_demodulation(rng: Generator, rate: int) -> None:
+    bpsc = rate_parameter(rate).bpsc
+
+    x = rng.integers(0, 1 << bpsc, (4, 8, 48), dtype=np.uint8)
+
+    d = modulate(x, rate)
+    d = d + rng.normal(0, 0.5, d.shape) + 1j * rng.normal(0, 0.5, d.shape)
+
+    llr = demodulate_soft(d, rate)
+
+    symbols = np.arange(1 << bpsc, dtype=np.uint8)
+
+    points = modulate(symbols, rate)
+    labels = np.array(unpackbits(symbols, count=bpsc))
+
+    distance = np.abs(d[..., None] - points) ** 2
+
+    for i in range(bpsc):
+        zero = np.min(distance[..., labels[:, i] == 0], axis=-1)
+        one = np.min(distance[..., labels[:, i] == 1], axis=-1)
+
+        assert np.allclose(llr[..., i], zero - one)
+
+    weight = rng.random(d.shape[-1])
+
+    assert np.allclose(demodulate_soft(d, rate, weight), llr * weight[:, None])
@@ -4,7 +4,9 @@
 # Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
 
 import numpy as np
+import scipy.fft
 
+from functools import cache
 from typing import (
     Final,
     Optional,
@@ -13,13 +15,16 @@ from typing import (
 from numpy import ndarray
 from numpy.fft import (
     fft,
-    fftshift,
     ifft,
     ifftshift,
 )
+from numpy.typing import (
+    ArrayLike,
+    DTypeLike,
+)
 from scipy.signal import resample
 
-from ppdu import Scrambler
+from ppdu import scramble
 
 CIRCULAR_PREFIX: Final[int] = 16
 
@@ -50,11 +55,80 @@ _DATA_INDICES[_FFT_SIZE // 2] = False
 _DATA_INDICES[:6] = False
 _DATA_INDICES[-5:] = False
 
+# subcarriers in transform order, folding the (i)fftshift into the index
+_PILOT_BINS: ndarray = (
+    np.flatnonzero(_PILOT_INDICES) - _FFT_SIZE // 2
+) % _FFT_SIZE
+_DATA_BINS: ndarray = (
+    np.flatnonzero(_DATA_INDICES) - _FFT_SIZE // 2
+) % _FFT_SIZE
+
 _PILOTS: ndarray = np.array([1, 1, 1, -1])
+_PILOT_POLARITY_PERIOD: Final[int] = 127
 
 FRAME_SIZE: Final[int] = _FFT_SIZE + CIRCULAR_PREFIX
 
 
+class FFTBackend:
+    def fft(self, x: ndarray) -> ndarray:
+        return fft(x)
+
+    def ifft(self, x: ndarray) -> ndarray:
+        return ifft(x)
+
+
+class MatrixFFTBackend(FFTBackend):
+    # a batch of short transforms is a single matrix product against
+    # precomputed twiddles
+    def fft(self, x: ndarray) -> ndarray:
+        return x @ _dft_matrix(np.result_type(x, np.complex64), False)
+
+    def ifft(self, x: ndarray) -> ndarray:
+        return x @ _dft_matrix(np.result_type(x, np.complex64), True)
+
+
+class ScipyFFTBackend(FFTBackend):
+    def __init__(self, *, workers: Optional[int] = None) -> None:
+        self.workers = workers
+
+    def fft(self, x: ndarray) -> ndarray:
+        return scipy.fft.fft(x, workers=self.workers)
+
+    def ifft(self, x: ndarray) -> ndarray:
+        return scipy.fft.ifft(x, workers=self.workers)
+
+
+@cache
+def _dft_matrix(dtype: np.dtype, inverse: bool) -> ndarray:
+    n = np.arange(_FFT_SIZE)
+
+    # reducing the exponent first keeps the twiddles exact to rounding
+    k = np.outer(n, n) % _FFT_SIZE
+
+    sign = 1 if inverse else -1
+
+    w = np.exp(sign * 2j * np.pi * k / _FFT_SIZE)
+
+    if inverse:
+        w /= _FFT_SIZE
+
+    w = w.astype(dtype)
+    w.flags.writeable = False
+
+    return w
+
+
+@cache
+def _pilot_polarity() -> ndarray:
+    zeros = np.zeros(_PILOT_POLARITY_PERIOD, dtype=np.uint8)
+
+    polarity = scramble(zeros, 0o177).astype(np.int8)
+    polarity = 1 - 2 * polarity
+    polarity.flags.writeable = False
+
+    return polarity
+
+
 def add_circular_prefix(x: ndarray, size: int = CIRCULAR_PREFIX) -> ndarray:
     assert size > 0
     assert size < x.shape[-1]
@@ -92,16 +166,36 @@ def carrier_frequency_offset(
     return np.mean(phi, axis=(-2, -1)) / samples
 
 
-def demodulate(s: ndarray, equalizer: Optional[ndarray] = None) -> ndarray:
-    if equalizer is None:
-        equalizer = np.array(1)
+def demodulate(
+    s: ndarray,
+    equalizer: Optional[ndarray] = None,
+    *,
+    backend: Optional[FFTBackend] = None,
+) -> ndarray:
+    if backend is None:
+        backend = FFTBackend()
 
-    d = fftshift(fft(s / equalizer), axes=-1)
+    if equalizer is not None:
+        s = s / equalizer
 
-    return d[..., _DATA_INDICES]
+    return np.take(backend.fft(s), _DATA_BINS, axis=-1)
 
 
+@cache
 def long_training_sequence() -> ndarray:
+    l = ifft(ifftshift(long_training_symbol(), axes=-1))  # noqa: E741
+
+    s = add_circular_prefix(
+        np.tile(l, LONG_TRAINING_SYMBOLS),
+        CIRCULAR_PREFIX * 2,
+    )
+    s.flags.writeable = False
+
+    return s
+
+
+@cache
+def long_training_symbol() -> ndarray:
     L = np.array(
         [
             # fmt: off
@@ -116,38 +210,55 @@ def long_training_sequence() -> ndarray:
             # fmt: on
         ],
     )
+    L.flags.writeable = False
 
-    l = ifft(ifftshift(L, axes=-1))  # noqa: E741
+    return L
 
-    return add_circular_prefix(
-        np.tile(l, LONG_TRAINING_SYMBOLS),
-        CIRCULAR_PREFIX * 2,
-    )
 
+def modulate(
+    d: ndarray,
+    offset: ArrayLike = 0,
+    *,
+    backend: Optional[FFTBackend] = None,
+) -> ndarray:
+    if backend is None:
+        backend = FFTBackend()
 
-def modulate(d: ndarray) -> ndarray:
     shape = d.shape[:-1]
 
-    s = np.zeros(shape + (_FFT_SIZE,), dtype=np.complex128)
+    # single precision symbols stay single precision through the transform
+    s = np.zeros(shape + (_FFT_SIZE,), dtype=np.result_type(d, np.complex64))
 
     frames = 1 if s.ndim <= 1 else s.shape[-2]
 
-    s[..., _PILOT_INDICES] = pilots(frames)
-    s[..., _DATA_INDICES] = d
+    s[..., _PILOT_BINS] = pilots(frames, offset)
+    s[..., _DATA_BINS] = d
 
-    return ifft(ifftshift(s, axes=-1))
+    return backend.ifft(s)
 
 
-def pilots(frames: int) -> ndarray:
+def pilots(frames: int, offset: ArrayLike = 0) -> ndarray:
     assert frames > 0
 
-    scrambler = Scrambler(0o177)
-    polarity = np.zeros(frames, dtype=np.int8)
+    # an array of offsets starts one run of frames per packet
+    index = np.asarray(offset)[..., None] + np.arange(frames)
+
+    polarity = _pilot_polarity()[index % _PILOT_POLARITY_PERIOD]
 
-    for i in range(frames):
-        polarity[i] = -1 if scrambler(polarity[i].astype(np.uint8)) else 1
+    return polarity[..., None] * _PILOTS
 
-    return polarity[:, None] * _PILOTS[None, :]
+
+@cache
+def preamble(dtype: DTypeLike = np.complex128) -> ndarray:
+    s = np.concatenate(
+        [
+            apply_window(short_training_sequence()),
+            apply_window(long_training_sequence()),
+        ],
+    ).astype(dtype)
+    s.flags.writeable = False
+
+    return s
 
 
 def remove_circular_prefix(x: ndarray, size: int = CIRCULAR_PREFIX) -> ndarray:
@@ -157,6 +268,7 @@ def remove_circular_prefix(x: ndarray, size: int = CIRCULAR_PREFIX) -> ndarray:
     return x[..., size:]
 
 
+@cache
 def short_training_sequence() -> ndarray:
     S = np.zeros(_FFT_SIZE, dtype=np.complex128)
 
@@ -178,7 +290,10 @@ def short_training_sequence() -> ndarray:
     s = ifft(ifftshift(np.sqrt(13 / 6) * S, axes=-1))
     s = np.tile(s, SHORT_TRAINING_SYMBOLS)
 
-    return resample(s, SHORT_TRAINING_SYMBOLS * SHORT_TRAINING_SYMBOL_SAMPLES)
+    s = resample(s, SHORT_TRAINING_SYMBOLS * SHORT_TRAINING_SYMBOL_SAMPLES)
+    s.flags.writeable = False
+
+    return s
 
 
 def unapply_window(x: ndarray) -> ndarray:
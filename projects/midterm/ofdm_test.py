@@ -9,11 +9,25 @@ import pytest
 import modulate
 import ofdm
 
+from galois import GF2
 from numpy import ndarray
+from numpy.fft import (
+    fft,
+    fftshift,
+    ifft,
+)
+from numpy.random import Generator
 
 from conftest import Data
-from ppdu import rate_parameter
+from ppdu import (
+    Scrambler,
+    rate_parameter,
+)
 from ofdm import (
+    CIRCULAR_PREFIX,
+    LONG_TRAINING_SIZE,
+    LONG_TRAINING_SYMBOLS,
+    SHORT_TRAINING_SIZE,
     SHORT_TRAINING_SYMBOLS,
     SHORT_TRAINING_SYMBOL_SAMPLES,
     carrier_frequency_offset,
@@ -47,6 +61,50 @@ def test_carrier_frequency_offset(
     assert np.isclose(phi, theta)
 
 
+@pytest.mark.parametrize(
+    "backend",
+    [
+        ofdm.MatrixFFTBackend(),
+        ofdm.ScipyFFTBackend(),
+        ofdm.ScipyFFTBackend(workers=2),
+    ],
+)
+@pytest.mark.parametrize("dtype", [np.complex64, np.complex128])
+def test_fft_backend(
+    rng: Generator,
+    backend: ofdm.FFTBackend,
+    dtype: type,
+) -> None:
+    x = rng.standard_normal((3, 5, 64)) + 1j * rng.standard_normal((3, 5, 64))
+    x = x.astype(dtype)
+
+    tolerance = 1e-4 if dtype == np.complex64 else 1e-12
+
+    assert backend.fft(x).dtype == dtype
+    assert backend.ifft(x).dtype == dtype
+
+    assert np.allclose(backend.fft(x), fft(x), atol=tolerance)
+    assert np.allclose(backend.ifft(x), ifft(x), atol=tolerance)
+
+    d = x[..., : ofdm.SUBCARRIERS_DATA]
+
+    s = ofdm.modulate(d, backend=backend)
+
+    assert np.allclose(s, ofdm.modulate(d), atol=tolerance)
+    assert np.allclose(ofdm.demodulate(s, backend=backend), d, atol=tolerance)
+
+
+def test_long_training_symbol() -> None:
+    s = ofdm.long_training_sequence()
+
+    symbols = s[2 * CIRCULAR_PREFIX :].reshape(LONG_TRAINING_SYMBOLS, -1)
+
+    assert np.allclose(
+        fftshift(fft(symbols), axes=-1),
+        ofdm.long_training_symbol(),
+    )
+
+
 def test_modulation(data: Data) -> None:
     rate = data.rate
 
@@ -76,3 +134,47 @@ def test_modulation(data: Data) -> None:
     demodulated = modulate.demodulate(r, rate)
 
     assert np.all(demodulated == d)
+
+
+def test_pilots() -> None:
+    scrambler = Scrambler(0o177)
+
+    polarity = np.array([1 - 2 * int(scrambler(GF2(0))) for _ in range(300)])
+
+    expected = polarity[:, None] * np.array([1, 1, 1, -1])
+
+    assert np.all(ofdm.pilots(300) == expected)
+    assert np.all(ofdm.pilots(300)[127:254] == expected[:127])
+
+    assert np.all(ofdm.pilots(100, 130) == expected[130:230])
+
+    offset = np.array([0, 5, 126])
+
+    batched = ofdm.pilots(10, offset)
+
+    assert batched.shape == (len(offset), 10, 4)
+
+    for batched_i, offset_i in zip(batched, offset):
+        assert np.all(batched_i == expected[offset_i : offset_i + 10])
+
+    d = np.zeros((len(offset), 10, ofdm.SUBCARRIERS_DATA))
+
+    for s_i, offset_i in zip(ofdm.modulate(d, offset), offset):
+        assert np.allclose(s_i, ofdm.modulate(d[0], offset_i))
+
+
+@pytest.mark.parametrize("dtype", [np.complex64, np.complex128])
+def test_preamble(dtype: type) -> None:
+    preamble = ofdm.preamble(dtype)
+
+    assert preamble.dtype == dtype
+    assert preamble.shape == (SHORT_TRAINING_SIZE + LONG_TRAINING_SIZE,)
+    assert not preamble.flags.writeable
+
+    assert preamble is ofdm.preamble(dtype)
+
+    short = ofdm.apply_window(ofdm.short_training_sequence())
+    long = ofdm.apply_window(ofdm.long_training_sequence())
+
+    assert np.allclose(preamble[:SHORT_TRAINING_SIZE], short)
+    assert np.allclose(preamble[SHORT_TRAINING_SIZE:], long)
@@ -6,10 +6,10 @@
 import galois
 import numpy as np
 
-from collections import deque
 from dataclasses import dataclass
 from fractions import Fraction
-from math import floor
+from functools import cache
+from math import gcd
 from typing import (
     Final,
     Optional,
@@ -18,12 +18,17 @@ from typing import (
 from galois import GF2
 from galois.typing import ArrayLike
 from numpy import ndarray
-from scipy.linalg import toeplitz
 
 from bit import (
+    BitVector,
+    bits_like,
     packbits,
     unpackbits,
 )
+from trellis import (
+    matrix2poly,
+    poly2matrix,
+)
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -41,6 +46,9 @@ class Signal:
     length: int
 
 
+_BITORDER: Final[str] = "little"
+_BYTE_BITS: Final[int] = 8
+
 _DECODE_RATE: Final[dict[int, int]] = {
     0b1011: 6,
     0b1111: 9,
@@ -96,6 +104,9 @@ _PUNCTURE_MASK: Final[dict[Fraction, ndarray]] = {
         dtype=np.bool,
     ),
 }
+# every non-zero seed of x^7 + x^4 + 1 walks the same maximal length cycle
+_SCRAMBLER_PERIOD: Final[int] = 127
+
 _RATE_PARAMETERS: Final[dict[int, RateParameter]] = {
     6: RateParameter(
         modulation="BPSK",
@@ -160,6 +171,7 @@ GENERATOR_CONSTRAINT_LENGTH: Final[int] = 7
 GENERATOR_POLYNOMIALS: Final[list[int]] = [0o133, 0o171]
 
 # fmt: off
+SCRAMBLER_SEED_INVALID: Final[int] = 0
 SCRAMBLER_SERVICE_BITS: Final[int] = 7
 SERVICE_BITS:           Final[int] = 16
 SIGNAL_BITS:            Final[int] = 24
@@ -167,17 +179,55 @@ SIGNAL_BITS:            Final[int] = 24
 
 
 class ConvolutionalEncoder:
-    def __call__(self, x: GF2) -> GF2:
-        k = self.k
+    def __call__(self, u: GF2) -> GF2:
+        # every call encodes a whole codeword from the zero state
+        y, _ = self._encode(u, np.zeros(self.k - 1, dtype=np.uint8))
 
-        X = GF2(toeplitz(x, [x[0]] + [0] * (k - 1)))
-
-        return X @ self.generator_matrix
+        return y
 
     def __init__(self, generator_matrix: GF2) -> None:
         self.generator_matrix = generator_matrix
 
         self.k = generator_matrix.shape[0]
+        self.n = generator_matrix.shape[1]
+
+        self._state = np.zeros(self.k - 1, dtype=np.uint8)
+        self._taps = list(zip(*np.nonzero(np.array(generator_matrix))))
+
+    def _encode(self, u: GF2, state: ndarray) -> tuple[GF2, ndarray]:
+        k = self.k
+
+        x = np.array(u, dtype=np.uint8)
+
+        state = np.broadcast_to(state, x.shape[:-1] + (k - 1,))
+
+        # the shift register holds the previous k - 1 input bits oldest
+        # first, every output bit is the sum of the taps over the register
+        x = np.concatenate([state, x], axis=-1)
+
+        y = np.zeros(
+            x.shape[:-1] + (x.shape[-1] - (k - 1), self.n),
+            dtype=np.uint8,
+        )
+
+        for delay, output in self._taps:
+            y[..., output] ^= x[..., k - 1 - delay : x.shape[-1] - delay]
+
+        return bits_like(y, u), x[..., x.shape[-1] - (k - 1) :].copy()
+
+    def reset(self) -> GF2:
+        state = GF2(self._state)
+
+        self._state = np.zeros(self.k - 1, dtype=np.uint8)
+
+        return state
+
+    def stream(self, u: GF2) -> GF2:
+        # chunks continue from the register left by the previous chunk until
+        # the next reset
+        y, self._state = self._encode(u, self._state)
+
+        return y
 
 
 class Interleaver:
@@ -185,126 +235,310 @@ class Interleaver:
         self._bpsc = bpsc
         self._cbps = cbps
 
+        self._forward, self._reverse = _interleaver_permutation(bpsc, cbps)
+
     def forward(self, x: ArrayLike) -> ArrayLike:
-        cbps = self._cbps
+        assert x.shape[-1] == self._cbps
 
+        return x[..., self._forward]
+
+    def reverse(self, x: ArrayLike) -> ArrayLike:
         assert x.shape[-1] == self._cbps
 
-        y = x.copy()
+        return x[..., self._reverse]
 
-        for k in range(cbps):
-            i = 1
 
-            i *= cbps / 16
-            i *= k % 16
-            i += floor(k / 16)
+class PuncturedEncoder:
+    def __call__(self, u: GF2) -> GF2:
+        # packed words already hold the bytes the tables are indexed by
+        if isinstance(u, BitVector):
+            count = len(u)
 
-            y[..., int(i)] = x[..., k]
+            x = u.to_bytes()
 
-        z = y.copy()
+        else:
+            count = u.shape[-1]
 
-        for i in range(cbps):
-            s = max(self._bpsc / 2, 1)
+            x = np.packbits(np.asarray(u), axis=-1, bitorder=_BITORDER)
 
-            j = 1
+        x = np.pad(
+            x,
+            [(0, 0)] * (x.ndim - 1) + [(0, -x.shape[-1] % len(self._tables))],
+        )
 
-            j *= s * floor(i / s)
-            j += (i + cbps - floor(16 * i / cbps)) % s
+        # the encoder state entering a byte is made up of the last input bits
+        # of the previous byte, every codeword starts in the zero state
+        state = np.zeros_like(x)
+        state[..., 1:] = x[..., :-1] >> (_BYTE_BITS - (self._k - 1))
 
-            z[..., int(j)] = y[..., i]
+        index = state.astype(np.int64) << _BYTE_BITS | x
+        index = index.reshape(index.shape[:-1] + (-1, len(self._tables)))
 
-        return z
+        y = np.concatenate(
+            [table[index[..., i]] for i, table in enumerate(self._tables)],
+            axis=-1,
+        )
+        y = y.reshape(y.shape[:-2] + (-1,))
 
-    def reverse(self, x: ArrayLike) -> ArrayLike:
-        cbps = self._cbps
+        y = y[..., : self._punctured_bits(count)]
 
-        assert x.shape[-1] == self._cbps
+        if isinstance(u, BitVector):
+            return BitVector.from_bits(y)
+
+        return bits_like(y, u)
 
-        y = x.copy()
+    def __init__(self, generator_matrix: GF2, coding_rate: Fraction) -> None:
+        polynomials, k = matrix2poly(generator_matrix)
 
-        for i in range(cbps):
-            s = max(self._bpsc / 2, 1)
+        self._k = k
+        self._n = len(polynomials)
+        self._puncture_mask = _PUNCTURE_MASK[coding_rate]
+        self._tables = _punctured_encoder_tables(
+            polynomials,
+            k,
+            coding_rate,
+        )
 
-            j = 1
+    def _punctured_bits(self, count: int) -> int:
+        mask = self._puncture_mask
 
-            j *= s * floor(i / s)
-            j += (i + cbps - floor(16 * i / cbps)) % s
+        periods, remainder = divmod(self._n * count, len(mask))
 
-            y[..., i] = x[..., int(j)]
+        return periods * int(np.sum(mask)) + int(np.sum(mask[:remainder]))
 
-        z = y.copy()
 
-        for k in range(cbps):
-            i = 1
+class Puncturer:
+    def __init__(self, coding_rate: Fraction) -> None:
+        self._puncture_mask = _PUNCTURE_MASK[coding_rate]
 
-            i *= cbps / 16
-            i *= k % 16
-            i += floor(k / 16)
+    def forward(self, x: ArrayLike) -> ArrayLike:
+        mask = self._puncture_mask
 
-            z[..., k] = y[..., int(i)]
+        shape = x.shape[:-1]
 
-        return z
+        y = x.reshape(shape + (-1, len(mask)))[..., mask]
 
+        return y.reshape(shape + (-1,))
 
-class Puncturer:
-    def __init__(self, coding_rate: Fraction) -> None:
-        puncture_mask = _PUNCTURE_MASK[coding_rate]
+    def reverse(self, x: ArrayLike) -> tuple[ArrayLike, ndarray]:
+        mask = self._puncture_mask
 
-        puncture_matrix = np.eye(len(puncture_mask), dtype=np.int64)
+        shape = x.shape[:-1]
 
-        self._puncture_matrix = GF2(puncture_matrix[:, puncture_mask])
+        x = x.reshape(shape + (-1, np.count_nonzero(mask)))
 
-    def _apply(self, x: GF2, G: GF2) -> GF2:
-        return (x.reshape(-1, G.shape[0]) @ G).flatten()
+        # punctured bits are zero filled, only the mask tells them apart
+        y = np.zeros_like(x, shape=x.shape[:-1] + (len(mask),))
+        y[..., mask] = x
 
-    def forward(self, x: GF2) -> GF2:
-        return self._apply(x, self._puncture_matrix)
+        valid = np.broadcast_to(mask, y.shape)
 
-    def reverse(self, x: GF2) -> GF2:
-        return self._apply(x, self._puncture_matrix.T)
+        return y.reshape(shape + (-1,)), valid.reshape(shape + (-1,))
 
 
 class Scrambler:
     k: Final[int] = 8
 
     def __call__(self, x: GF2):
-        y = x.copy()
+        # packed words are scrambled as a single stream, just like flattened
+        # bits are
+        if isinstance(x, BitVector):
+            assert x.words.ndim == 1
+
+            y = scramble(x, self._seed, self._offset)
+
+            count = len(y)
 
-        if not y.ndim:
-            y = np.expand_dims(y, 0)
+        else:
+            y = scramble(np.ravel(x), self._seed, self._offset)
 
-        for y_i in np.nditer(y, op_flags=["readwrite"]):
-            y_i[...] = self._step(y_i)
+            count = y.size
 
-        return y.squeeze()
+            y = y.reshape(np.shape(x)).squeeze()
+
+        self._offset = (self._offset + count) % _SCRAMBLER_PERIOD
+
+        return y
 
     def __init__(self, state: int):
         _ = self.seed(state)
 
-    def _step(self, x: GF2) -> GF2:
-        state = self._state
+    def reset(self) -> GF2:
+        _, states = _scrambler_period()
 
-        feedback = state[6] ^ state[3]
+        state = int(states[self._seed, self._offset])
 
-        _ = state.pop()
+        self._offset = 0
 
-        state.appendleft(feedback)
+        return galois.Poly.Int(state, field=GF2).coefficients(self.k - 1)
 
-        return x ^ feedback
+    def seed(self, state: int) -> None:
+        assert state >= 0
+        assert state < 1 << (self.k - 1)
 
-    def reset(self) -> GF2:
-        state = GF2(list(self._state))
+        self._seed = state
+        self._offset = 0
 
-        self._state = deque(self._init_state)
 
-        return state
+@cache
+def _deinterleave_depuncture_map(
+    bpsc: int,
+    cbps: int,
+    coding_rate: Fraction,
+) -> tuple[ndarray, ndarray]:
+    _, reverse = _interleaver_permutation(bpsc, cbps)
+
+    mask = _PUNCTURE_MASK[coding_rate]
+
+    # every symbol starts on a fresh repetition of the puncture pattern
+    assert cbps % np.count_nonzero(mask) == 0
 
-    def seed(self, state: int) -> GF2:
-        state = galois.Poly.Int(state, field=GF2).coefficients(self.k - 1)
+    valid = np.tile(mask, cbps // np.count_nonzero(mask))
+    valid.flags.writeable = False
 
-        self._init_state = state.copy()
+    # kept coded bits appear in order, so the n-th one is the n-th
+    # deinterleaved bit, erasures read anything and get zeroed after
+    index = np.zeros(len(valid), dtype=np.int64)
+    index[valid] = reverse
+    index.flags.writeable = False
 
-        self._state = deque(state)
+    return index, valid
+
+
+@cache
+def _interleaver_permutation(bpsc: int, cbps: int) -> tuple[ndarray, ndarray]:
+    k = np.arange(cbps)
+
+    # adjacent coded bits land on nonadjacent subcarriers
+    i = (cbps // 16) * (k % 16) + k // 16
+
+    # then alternate between less and more significant constellation bits
+    s = max(bpsc // 2, 1)
+
+    j = s * (i // s) + (i + cbps - 16 * i // cbps) % s
+
+    reverse = j.astype(np.int64)
+    reverse.flags.writeable = False
+
+    forward = np.argsort(reverse)
+    forward.flags.writeable = False
+
+    return forward, reverse
+
+
+@cache
+def _punctured_encoder_tables(
+    polynomials: tuple[int, ...],
+    k: int,
+    coding_rate: Fraction,
+) -> tuple[ndarray, ...]:
+    # the encoder state has to fit within the previous byte
+    assert k - 1 <= _BYTE_BITS
+
+    n = len(polynomials)
+
+    generator_matrix = poly2matrix(list(polynomials), k)
+
+    index = np.arange(1 << (k - 1 + _BYTE_BITS), dtype=np.int64)
+
+    x = np.concatenate(
+        [
+            np.unpackbits(
+                (index >> _BYTE_BITS).astype(np.uint8)[:, None],
+                axis=-1,
+                count=k - 1,
+                bitorder=_BITORDER,
+            ),
+            np.unpackbits(
+                (index & 0xFF).astype(np.uint8)[:, None],
+                axis=-1,
+                bitorder=_BITORDER,
+            ),
+        ],
+        axis=-1,
+    )
+
+    y = ConvolutionalEncoder(generator_matrix)(GF2(x))
+    y = np.array(y[:, k - 1 :]).reshape(len(index), -1)
+
+    # a byte shifts the puncture pattern by its coded bits, so bytes cycle
+    # through every phase of the pattern before it realigns
+    mask = _PUNCTURE_MASK[coding_rate]
+
+    phases = len(mask) // gcd(n * _BYTE_BITS, len(mask))
+
+    tables = []
+
+    for phase in range(phases):
+        offset = phase * n * _BYTE_BITS
+
+        table = y[:, mask[(offset + np.arange(y.shape[-1])) % len(mask)]]
+        table.flags.writeable = False
+
+        tables.append(table)
+
+    return tuple(tables)
+
+
+@cache
+def _scrambler_period() -> tuple[ndarray, ndarray]:
+    k = Scrambler.k
+
+    # the register of every seed, most recent feedback bit first
+    state = np.arange(1 << (k - 1), dtype=np.int64)
+
+    sequence = np.empty((len(state), _SCRAMBLER_PERIOD), dtype=np.uint8)
+    states = np.empty(sequence.shape, dtype=np.int64)
+
+    for i in range(_SCRAMBLER_PERIOD):
+        states[:, i] = state
+
+        feedback = (state ^ (state >> 3)) & 1
+
+        state = state >> 1 | feedback << (k - 2)
+
+        sequence[:, i] = feedback
+
+    sequence.flags.writeable = False
+    states.flags.writeable = False
+
+    return sequence, states
+
+
+@cache
+def _scrambler_seeds() -> ndarray:
+    sequence, _ = _scrambler_period()
+
+    # the first outputs of a seed fill its register, so every non-zero
+    # pattern of scrambled zeros belongs to exactly one seed
+    index = sequence[:, :SCRAMBLER_SERVICE_BITS] @ _scrambler_weights()
+
+    assert len(np.unique(index)) == len(index)
+
+    seeds = np.zeros(len(index), dtype=np.int64)
+    seeds[index] = np.arange(len(index))
+
+    seeds.flags.writeable = False
+
+    return seeds
+
+
+@cache
+def _scrambler_words() -> ndarray:
+    sequence, _ = _scrambler_period()
+
+    # the period is odd, so a word can start at any phase of the sequence
+    phase = np.arange(_SCRAMBLER_PERIOD)[:, None]
+    phase = (phase + np.arange(BitVector.word_bits)) % _SCRAMBLER_PERIOD
+
+    words = BitVector.from_bits(sequence[:, phase]).words[..., 0]
+    words.flags.writeable = False
+
+    return words
+
+
+def _scrambler_weights() -> ndarray:
+    return 1 << np.arange(SCRAMBLER_SERVICE_BITS, dtype=np.int64)
 
 
 def decode_rate(rate: int) -> int:
@@ -318,7 +552,7 @@ def decode_rate(rate: int) -> int:
 def decode_signal(signal: GF2) -> Optional[Signal]:
     assert signal.shape == (24,)
 
-    if np.sum(signal[0:17]) != signal[17]:
+    if np.sum(np.array(signal[0:17]), dtype=np.int64) % 2 != signal[17]:
         return None
 
     # fmt: off
@@ -335,6 +569,27 @@ def decode_signal(signal: GF2) -> Optional[Signal]:
     return Signal(rate, length)
 
 
+def deinterleave_depuncture(
+    x: ArrayLike,
+    *,
+    bpsc: int,
+    cbps: int,
+    coding_rate: Fraction,
+) -> tuple[ArrayLike, ndarray]:
+    index, valid = _deinterleave_depuncture_map(bpsc, cbps, coding_rate)
+
+    assert x.shape[-1] % cbps == 0
+
+    shape = x.shape[:-1] + (-1,)
+
+    y = np.asarray(x).reshape(x.shape[:-1] + (-1, cbps))[..., index]
+    y *= valid
+
+    valid = np.broadcast_to(valid, y.shape).reshape(shape)
+
+    return bits_like(y.reshape(shape), x), valid
+
+
 def encode_rate(rate: int) -> int:
     try:
         return _ENCODE_RATE[rate]
@@ -375,5 +630,33 @@ def rate_parameter(rate: int) -> RateParameter:
         raise KeyError(f"Unsupported rate: {rate}")
 
 
+def scramble(x: GF2, seed: ArrayLike, offset: int = 0) -> GF2:
+    if isinstance(x, BitVector):
+        words = np.arange(x.words.shape[-1]) * BitVector.word_bits
+        words = (offset + words) % _SCRAMBLER_PERIOD
+
+        seed = np.asarray(seed)[..., None]
+
+        return x ^ BitVector(_scrambler_words()[seed, words], len(x))
+
+    sequence, _ = _scrambler_period()
+
+    index = np.arange(offset, offset + x.shape[-1]) % _SCRAMBLER_PERIOD
+
+    seed = np.asarray(seed)[..., None]
+
+    y = np.array(x, dtype=np.uint8) ^ sequence[seed, index]
+
+    return bits_like(y, x)
+
+
+def scrambler_seed(service: GF2) -> ndarray:
+    assert service.shape[-1] == SCRAMBLER_SERVICE_BITS
+
+    index = np.array(service, dtype=np.int64) @ _scrambler_weights()
+
+    return _scrambler_seeds()[index]
+
+
 def service() -> GF2:
     return GF2.Zeros(SERVICE_BITS)
@@ -10,12 +10,85 @@ from fractions import Fraction
 from galois import GF2
 from numpy.random import Generator
 
+from bit import BitVector
 from ppdu import (
+    ConvolutionalEncoder,
+    GENERATOR_CONSTRAINT_LENGTH,
+    GENERATOR_POLYNOMIALS,
     Interleaver,
+    PuncturedEncoder,
     Puncturer,
+    SCRAMBLER_SEED_INVALID,
+    SCRAMBLER_SERVICE_BITS,
     Scrambler,
+    deinterleave_depuncture,
     rate_parameter,
+    scramble,
+    scrambler_seed,
 )
+from trellis import poly2matrix
+
+
+def test_convolutional_encoder(rng: Generator, random_count: int) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random((4, random_count), seed=rng)
+
+    expected = np.array(
+        [
+            [np.convolve(x_i, g)[:random_count] & 1 for g in np.array(G.T)]
+            for x_i in np.array(x)
+        ]
+    )
+    expected = np.swapaxes(expected, -2, -1)
+
+    c = ConvolutionalEncoder(G)
+
+    assert np.all(c(x) == expected)
+    assert np.all(c(x) == expected)
+
+    assert np.all(c(x[0]) == expected[0])
+
+    y = [c.stream(x[:, i : i + 100]) for i in range(0, random_count, 100)]
+
+    assert np.all(np.concatenate(y, axis=-2) == expected)
+    assert np.all(c.reset() == x[:, -(k - 1) :])
+
+    assert np.all(c.stream(x[0]) == expected[0])
+
+
+def test_deinterleave_depuncture(
+    rng: Generator,
+    random_count: int,
+    rate: int,
+) -> None:
+    parameter = rate_parameter(rate)
+
+    count = random_count - random_count % parameter.cbps
+
+    x = GF2.Random((4, count), seed=rng)
+
+    y, valid = deinterleave_depuncture(
+        x,
+        bpsc=parameter.bpsc,
+        cbps=parameter.cbps,
+        coding_rate=parameter.coding_rate,
+    )
+
+    interleaver = Interleaver(bpsc=parameter.bpsc, cbps=parameter.cbps)
+    puncturer = Puncturer(parameter.coding_rate)
+
+    for x_i, y_i, valid_i in zip(x, y, valid):
+        deinterleaved = interleaver.reverse(x_i.reshape(-1, parameter.cbps))
+
+        depunctured, depunctured_valid = puncturer.reverse(
+            deinterleaved.flatten()
+        )
+
+        assert np.all(y_i == depunctured)
+        assert np.all(valid_i == depunctured_valid)
 
 
 def test_interleaver(rate: int) -> None:
@@ -36,26 +109,110 @@ def test_interleaver(rate: int) -> None:
 
     assert np.all(x == deinterleaved)
 
+    x = np.stack([x, x[::-1]])
+
+    assert np.all(interleaver.forward(x)[0] == interleaved)
+    assert np.all(interleaver.reverse(interleaver.forward(x)) == x)
+
+
+def test_punctured_encoder(
+    rng: Generator,
+    random_count: int,
+    rate: int,
+) -> None:
+    parameter = rate_parameter(rate)
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, GENERATOR_CONSTRAINT_LENGTH)
+
+    count = random_count - random_count % parameter.dbps
+
+    x = GF2.Random((4, count), seed=rng)
+
+    y = PuncturedEncoder(G, parameter.coding_rate)(x)
+
+    assert y.shape == (len(x), count // parameter.dbps * parameter.cbps)
+
+    for x_i, y_i in zip(x, y):
+        c = ConvolutionalEncoder(G)
+        p = Puncturer(parameter.coding_rate)
+
+        assert np.all(y_i == p.forward(c(x_i).flatten()))
+
+    packed = PuncturedEncoder(G, parameter.coding_rate)(BitVector.from_bits(x))
+
+    assert np.all(packed.to_bits() == y)
+
 
 def test_puncturer(rng: Generator, random_count: int, rate: int) -> None:
     parameter = rate_parameter(rate)
 
     puncturer = Puncturer(parameter.coding_rate)
 
-    data = GF2.Random(random_count + (-random_count % 36), seed=rng)
+    data = GF2.Random((4, random_count + (-random_count % 36)), seed=rng)
 
     punctured = puncturer.forward(data)
 
-    assert len(punctured) <= len(data)
+    assert punctured.shape[:-1] == data.shape[:-1]
+    assert punctured.shape[-1] <= data.shape[-1]
+
+    unpunctured, valid = puncturer.reverse(punctured)
+
+    assert unpunctured.shape == data.shape
+    assert valid.shape == data.shape
 
-    unpunctured = puncturer.reverse(punctured)
+    assert np.all(unpunctured[valid] == data[valid])
+    assert np.all(unpunctured[~valid] == 0)
+    assert np.all(np.sum(valid, axis=-1) == punctured.shape[-1])
 
-    assert len(unpunctured) == len(data)
+    llr, llr_valid = puncturer.reverse(2.0 * np.array(punctured) - 1)
+
+    assert np.all(llr_valid == valid)
+    assert np.all((llr > 0) == (unpunctured == 1))
+    assert np.all(llr[~valid] == 0)
 
     if parameter.coding_rate == Fraction(1, 2):
         return
 
-    assert np.any(unpunctured != data)
+    assert np.any(~valid)
+
+
+def test_scramble(rng: Generator, random_count: int) -> None:
+    seed = rng.integers(0, 1 << (Scrambler.k - 1), 8)
+
+    x = GF2.Random((len(seed), random_count), seed=rng)
+
+    y = scramble(x, seed)
+
+    for x_i, y_i, seed_i in zip(x, y, seed):
+        scrambler = Scrambler(int(seed_i))
+
+        assert np.all(y_i[:100] == scrambler(x_i[:100]))
+        assert np.all(y_i[100:] == scrambler(x_i[100:]))
+
+    assert np.all(scramble(y[:, 100:], seed, 100) == x[:, 100:])
+
+    packed = scramble(BitVector.from_bits(x[:, 100:]), seed, 100)
+
+    assert np.all(packed.to_bits() == y[:, 100:])
+
+    scrambler = Scrambler(int(seed[0]))
+
+    for i in range(0, 200, 50):
+        packed = scrambler(BitVector.from_bits(x[0, i : i + 50]))
+
+        assert np.all(packed.to_bits() == y[0, i : i + 50])
+
+
+def test_scrambler_seed() -> None:
+    seed = np.arange(1, 1 << (Scrambler.k - 1))
+
+    service = scramble(GF2.Zeros((len(seed), SCRAMBLER_SERVICE_BITS)), seed)
+
+    assert np.all(scrambler_seed(service) == seed)
+
+    invalid = scrambler_seed(GF2.Zeros(SCRAMBLER_SERVICE_BITS))
+
+    assert invalid == SCRAMBLER_SEED_INVALID
 
 
 def test_scrambler() -> None:
@@ -151,10 +151,10 @@ rng: np.random.Generator = np.random.default_rng(0x509355EF)
 puncturer = ppdu.Puncturer(Fraction(2, 3))
 
 punctured = puncturer.forward(GF2.Ones(12))
-depunctured = puncturer.reverse(punctured)
+_, valid = puncturer.reverse(punctured)
 
-x = np.arange(depunctured.size)
-x[~np.array(depunctured, dtype=np.bool)] = -1
+x = np.arange(valid.size)
+x[~valid] = -1
 
 x.reshape(-1, 2).T
 
@@ -383,30 +383,18 @@ plt.show()
 # On instantiation, the decoder will pre-compute all possible states and
 # state transitions given a generator matrix. This is done to avoid
 # having to recompute these values for every step through a trellis.
-#
-# To keep track of the path metric through the trellis, I opted to use a
-# 4D array as it could encapsulate all the information necessary to
-# decode the best path through the trellis. Each of the dimensions kept
-# track of the following:
-#
-# 1) Time index for the trellis.
-# 2) The possible input for the state, where the index into this
-#    dimension coincides with the bit sequence received.
-# 3) The branch state, where the index into this dimension coincides
-#    with the current state.
-# 4) The previous state, where the index of this dimension coincides
-#    with the path metric from the previous states.
-#
-# Each element of this array corresponds to the path metric. Using the
-# implicitly encoded information found in each of the dimensions, it's
-# possible to decode the optimal path. The main downside of my
-# implementation is the sparsity of the use in the last dimension as
-# only every other row gets utilized due to how state transitions get
-# computed. This isn't *too* problematic for convolutional codes where
-# the input is only one bit, but this scales exponentially: $(1/2)^{n}$.
-# A solution would be to remove the $2^\text{nd}$ dimension and
-# implicitly encode this in the last dimension, however, I avoided this
-# due to time constraints.
+# These tables only depend on the generator polynomials, so they are
+# built once per process and shared between every encoder and decoder.
+#
+# Every state of the trellis is entered from exactly two previous
+# states, both of which share the same input bit. Instead of storing
+# the path metric of every possible transition, the decoder only keeps
+# a single path metric per state. At every step through the trellis,
+# the two candidate path metrics of each state are added, compared, and
+# the smaller one selected for all states at once. The outcome of the
+# comparison (which of the two previous states survived) is a single
+# bit per state, so the survivor memory of the 64-state code is only
+# eight bytes per trellis step.
 #
 # To calculate the branch metrics for each of the paths, we simply
 # compute the Hamming weight between the expected values and received
@@ -416,15 +404,18 @@ plt.show()
 # calculation to improve decoding performance.
 #
 # We initialize the path metrics to $\infty$ with the exception to the
-# zero state and zero bit which take on a value of zero. Since we've
-# agreed ahead of time that all encoded bit sequences are to start and
-# end in the zero state, we can make this assertion. When decoding, we
-# similarly stat decoding at the zero state assuming that the last value
-# received was a zero. To recover the input bit sequence, we simply look
-# at the argument of the minima of the previous state's path metric.
-# Once identified, we then look at the argument of the minima of the
-# possible input for the state. This then yields the predicted bit along
-# with the best previous state.
+# zero state which takes on a value of zero. Since we've agreed ahead of
+# time that all encoded bit sequences are to start and end in the zero
+# state, we can make this assertion. When decoding, we similarly start
+# the traceback at the zero state. To recover the input bit sequence, we
+# walk the survivor bits backwards: the current state yields the
+# predicted bit, and its survivor bit yields the best previous state.
+#
+# Short frames, like the 24-bit SIGNAL field, skip the traceback
+# entirely. Each state instead carries its whole survivor path as a
+# word alongside its path metric, which gets copied forward with the
+# surviving previous state. Once the last step is reached, the decoded
+# bits are simply read off the word held by the zero state.
 
 # %% [markdown]
 # # Results
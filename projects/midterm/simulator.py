@@ -16,8 +16,13 @@ from pathlib import Path
 
 from numpy import ndarray
 from numpy.random import Generator
+from numpy.typing import DTypeLike
 from tqdm import trange
 
+from trellis import (
+    load_trellis_cache,
+    save_trellis_cache,
+)
 from wifi import (
     Rx,
     Tx,
@@ -25,10 +30,10 @@ from wifi import (
 
 
 def calculate_ber(value: ndarray, expected: ndarray) -> ndarray:
-    value = bit.unpackbits(value)
-    expected = bit.unpackbits(expected)
+    value = bit.BitVector.from_bytes(value)
+    expected = bit.BitVector.from_bytes(expected)
 
-    return np.mean(value != expected, axis=(-2, -1))
+    return (value ^ expected).count() / len(value)
 
 
 def main() -> None:
@@ -78,27 +83,49 @@ def main() -> None:
         "--output",
         type=Path,
     )
+    parser.add_argument(
+        "--trellis-cache",
+        type=Path,
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["complex64", "complex128"],
+        default="complex128",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+    )
 
     args = parser.parse_args()
 
-    rng = np.random.default_rng(args.seed)
+    if args.trellis_cache is not None and args.trellis_cache.exists():
+        load_trellis_cache(args.trellis_cache)
 
     snr = np.linspace(args.snr_min, args.snr_max, args.points)
-    ber = np.zeros((args.points, args.iterations))
 
-    for i in trange(args.points, ncols=80):
-        for j in range(args.iterations):
-            data, received = sim(rng, args.bytes, args.rate, snr[i])
-            ber[i, j] = calculate_ber(received, data)
+    ber = sweep(args, snr, args.dtype)
+
+    columns = [snr, ber]
+    header = "snr, ber"
 
-    ber = np.mean(ber, axis=-1)
+    # rerun the same draws in double precision to bound the error of a
+    # single precision sweep
+    if args.validate:
+        reference = sweep(args, snr, np.complex128)
+
+        columns += [reference, ber - reference]
+        header += ", ber_complex128, difference"
+
+    if args.trellis_cache is not None:
+        save_trellis_cache(args.trellis_cache)
 
     output = Path(f"{args.rate}.csv") if args.output is None else args.output
 
     np.savetxt(
         output,
-        np.array([snr, ber]).T,
-        header="snr, ber",
+        np.array(columns).T,
+        header=header,
         delimiter=",",
     )
 
@@ -108,9 +135,10 @@ def sim(
     bytes: int,
     rate: int,
     snr_db: np.double,
+    dtype: DTypeLike = np.complex128,
 ) -> tuple[ndarray, ndarray]:
-    tx = Tx(rng=rng)
-    rx = Rx()
+    tx = Tx(rng=rng, dtype=dtype)
+    rx = Rx(dtype=dtype)
 
     data = rng.integers(0, 256, bytes, dtype=np.uint8)
 
@@ -121,14 +149,34 @@ def sim(
 
     noise_scale = np.sqrt((p_signal / snr) / 2)
 
-    noise = 0
-    noise += rng.normal(0, noise_scale, signal.shape) + 0j
-    noise += 1j * rng.normal(0, noise_scale, signal.shape)
+    # noise is always drawn in double precision, so every sample precision
+    # consumes the generator identically and sees the same noise
+    noise = rng.standard_normal(signal.shape) + 0j
+    noise += 1j * rng.standard_normal(signal.shape)
+    noise *= noise_scale
+    noise = noise.astype(signal.dtype, copy=False)
 
     received = rx(signal + noise, ppdu.Signal(rate, data.size))
 
+    # frames without a valid scrambler seed are dropped, nothing arrives
+    if received is None:
+        received = np.zeros_like(data)
+
     return data, received
 
 
+def sweep(args, snr: ndarray, dtype: DTypeLike) -> ndarray:
+    rng = np.random.default_rng(args.seed)
+
+    ber = np.zeros((len(snr), args.iterations))
+
+    for i in trange(len(snr), ncols=80):
+        for j in range(args.iterations):
+            data, received = sim(rng, args.bytes, args.rate, snr[i], dtype)
+            ber[i, j] = calculate_ber(received, data)
+
+    return np.mean(ber, axis=-1)
+
+
 if __name__ == "__main__":
     sys.exit(main())
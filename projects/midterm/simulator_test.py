@@ -0,0 +1,21 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# simulator_test.py -- IEEE Std 802.11a-1999 simulator tests
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import numpy as np
+
+from simulator import sim
+
+
+def test_sim_precision(seed: int, rate: int) -> None:
+    rng = np.random.default_rng(seed)
+    single_rng = np.random.default_rng(seed)
+
+    for snr_db in [0.0, 10.0, 40.0]:
+        data, _ = sim(rng, 32, rate, snr_db)
+        single_data, _ = sim(single_rng, 32, rate, snr_db, np.complex64)
+
+        assert np.all(single_data == data)
+
+        assert rng.bit_generator.state == single_rng.bit_generator.state
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# trellis.py -- convolutional code trellis
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import galois
+import numpy as np
+
+from dataclasses import (
+    dataclass,
+    fields,
+)
+from functools import cache
+from os import PathLike
+from typing import Final
+
+from galois import GF2
+from numpy import ndarray
+
+from bit import packbits
+
+_CACHE_PREFIX: Final[str] = "trellis"
+
+
+@dataclass(frozen=True, kw_only=True)
+class Trellis:
+    branch: ndarray
+    expected: ndarray
+    input: ndarray
+    previous: ndarray
+    symbol: ndarray
+
+
+_TRELLIS: dict[tuple[tuple[int, ...], int], Trellis] = {}
+
+
+def _build(polynomials: tuple[int, ...], k: int) -> Trellis:
+    generator_matrix = poly2matrix(polynomials, k)
+
+    states = GF2.Zeros((1 << (k - 1), k))
+    states[:, 1:] = GF2(
+        [
+            galois.Poly.Int(i, field=GF2).coefficients(k - 1, "asc")
+            for i in range(states.shape[0])
+        ]
+    )
+
+    zero_branch = packbits(np.array(states[:, :-1]))
+    zero_expected = states @ generator_matrix
+
+    states[:, 0] = 1
+
+    one_branch = packbits(np.array(states[:, :-1]))
+    one_expected = states @ generator_matrix
+
+    branch = np.stack([zero_branch, one_branch]).astype(np.int64)
+    expected = np.stack([zero_expected, one_expected]).view(np.ndarray)
+
+    # every state is entered from exactly two previous states with the same
+    # input bit, order them so ties favour the lower previous state
+    order = np.lexsort((np.tile(np.arange(len(states)), 2), branch.flatten()))
+
+    previous = order % len(states)
+    previous = previous.reshape(len(states), 2)
+
+    symbol = packbits(expected.reshape(-1, len(polynomials)))
+    symbol = symbol[order].reshape(len(states), 2)
+
+    return Trellis(
+        branch=branch,
+        expected=expected.astype(np.uint8),
+        input=(order[::2] // len(states)).astype(np.uint8),
+        previous=previous,
+        symbol=symbol,
+    )
+
+
+def _freeze(trellis: Trellis) -> Trellis:
+    for field in fields(trellis):
+        getattr(trellis, field.name).flags.writeable = False
+
+    return trellis
+
+
+def _key_name(key: tuple[tuple[int, ...], int]) -> str:
+    polynomials, k = key
+
+    return "-".join([_CACHE_PREFIX, *map(str, polynomials), str(k)])
+
+
+@cache
+def _poly2matrix(polynomials: tuple[int, ...], k: int) -> GF2:
+    generator_matrix = GF2(
+        [
+            galois.Poly.Int(polynomial, field=GF2).coefficients(k, "asc")
+            for polynomial in polynomials
+        ]
+    ).T
+
+    generator_matrix.flags.writeable = False
+
+    return generator_matrix
+
+
+def load_trellis_cache(path: str | PathLike) -> None:
+    with np.load(path) as data:
+        names = {name.rpartition(".")[0] for name in data.files}
+
+        for name in names:
+            _, *polynomials, k = name.split("-")
+
+            key = (tuple(map(int, polynomials)), int(k))
+
+            _TRELLIS[key] = _freeze(
+                Trellis(
+                    **{
+                        field.name: data[f"{name}.{field.name}"]
+                        for field in fields(Trellis)
+                    }
+                )
+            )
+
+
+def matrix2poly(generator_matrix: GF2) -> tuple[tuple[int, ...], int]:
+    k = generator_matrix.shape[0]
+
+    weights = 1 << np.arange(k, dtype=np.int64)
+
+    polynomials = weights @ np.array(generator_matrix, dtype=np.int64)
+
+    return tuple(map(int, polynomials)), k
+
+
+def poly2matrix(polynomials: list[int], k: int) -> GF2:
+    assert k > 0
+    assert len(polynomials) >= 1
+
+    return _poly2matrix(tuple(polynomials), k)
+
+
+def save_trellis_cache(path: str | PathLike) -> None:
+    # savez appends .npz to bare paths, a file object keeps the name as is
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            **{
+                f"{_key_name(key)}.{field.name}": getattr(trellis, field.name)
+                for key, trellis in _TRELLIS.items()
+                for field in fields(trellis)
+            },
+        )
+
+
+def trellis(polynomials: list[int], k: int) -> Trellis:
+    key = (tuple(polynomials), k)
+
+    if key not in _TRELLIS:
+        _TRELLIS[key] = _freeze(_build(*key))
+
+    return _TRELLIS[key]
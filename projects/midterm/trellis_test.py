@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# trellis_test.py -- convolutional code trellis tests
+# Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
+
+import numpy as np
+import pytest
+
+import trellis as t
+
+from dataclasses import fields
+from pathlib import Path
+
+from ppdu import (
+    GENERATOR_CONSTRAINT_LENGTH,
+    GENERATOR_POLYNOMIALS,
+)
+from trellis import (
+    Trellis,
+    load_trellis_cache,
+    matrix2poly,
+    poly2matrix,
+    save_trellis_cache,
+    trellis,
+)
+from viterbi import Viterbi
+
+
+@pytest.mark.parametrize(
+    "polynomials, k",
+    (
+        ((0b111, 0b101), 3),
+        ((0o133, 0o171), 7),
+    ),
+)
+def test_matrix2poly(polynomials: tuple[int, int], k: int) -> None:
+    assert matrix2poly(poly2matrix(polynomials, k)) == (polynomials, k)
+
+
+def test_trellis_cache() -> None:
+    polynomials = GENERATOR_POLYNOMIALS
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    cached = trellis(polynomials, k)
+
+    assert trellis(polynomials, k) is cached
+
+    for field in fields(Trellis):
+        assert not getattr(cached, field.name).flags.writeable
+
+    G = poly2matrix(polynomials, k)
+
+    assert G is poly2matrix(polynomials, k)
+    assert Viterbi(G)._previous is Viterbi(G)._previous
+
+
+@pytest.mark.parametrize("name", ["trellis.npz", "trellis"])
+def test_trellis_persistence(tmp_path: Path, name: str) -> None:
+    path = tmp_path / name
+
+    cached = trellis(GENERATOR_POLYNOMIALS, GENERATOR_CONSTRAINT_LENGTH)
+
+    save_trellis_cache(path)
+
+    t._TRELLIS.clear()
+
+    assert path.exists()
+    assert list(tmp_path.iterdir()) == [path]
+
+    load_trellis_cache(path)
+
+    loaded = trellis(GENERATOR_POLYNOMIALS, GENERATOR_CONSTRAINT_LENGTH)
+
+    assert loaded is not cached
+
+    for field in fields(Trellis):
+        assert np.all(
+            getattr(loaded, field.name) == getattr(cached, field.name)
+        )
+        assert not getattr(loaded, field.name).flags.writeable
@@ -3,52 +3,96 @@
 # viterbi.py -- Viterbi decoder
 # Copyright (C) 2025  Jacob Koziej <jacobkoziej@gmail.com>
 
-import galois
+import os
+
 import numpy as np
 
-from typing import Optional
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import (
+    Final,
+    Optional,
+    Self,
+)
 
-from einops import reduce
 from galois import GF2
 from numpy import ndarray
 
-from bit import packbits
+from bit import (
+    bits,
+    bits_like,
+    unpackbits,
+)
+from trellis import (
+    matrix2poly,
+    trellis,
+)
 
+_BITORDER: Final[str] = "little"
 
-class Viterbi:
-    def __call__(self, x: GF2, valid: Optional[ndarray] = None) -> GF2:
-        if valid is None:
-            valid = np.full(x.shape, True)
+# bit-sliced path metrics hold one codeword per bit of a word
+_BITSLICE_DTYPE: Final[str] = "<u8"
+_BITSLICE_LANES: Final[int] = 64
 
-        n = self.n
-        states = self.states
+# larger than any reachable path metric, small enough to never overflow
+_UNREACHABLE: Final[int] = 1 << 32
 
-        x = x.reshape(-1, n)
-        valid = valid.reshape(x.shape)
+# the decoder a parallel worker process decodes its blocks with
+_PARALLEL_WORKER: Final[dict[str, "ParallelViterbi"]] = {}
 
-        cost = np.full((len(x) + 1, n, states, states), np.inf)
-        cost[0, 0, 0, 0] = 0
+# blocks of a parallel decode overlap by this multiple of the constraint
+# length on each side, enough for survivor paths to merge
+_PARALLEL_MARGIN: Final[int] = 16
 
-        for i, (x_i, valid_i) in enumerate(zip(x, valid)):
-            new_cost = self._forward_step(x_i, valid_i, cost[i])
+# frames up to this many steps keep their survivor paths in the low half of
+# a word per state, the path metric in the high half, and skip the traceback
+_REGISTER_EXCHANGE: Final[int] = 32
+_REGISTER_EXCHANGE_UNREACHABLE: Final[int] = 1 << 24
 
-            cost[i + 1] = new_cost
+# soft path metrics are renormalized and saturated every few steps, int16
+# leaves enough headroom above the saturation limit for the steps between
+_SOFT_NORMALIZE: Final[int] = 32
+_SOFT_UNREACHABLE: Final[int] = 1 << 14
+
+# log-likelihood ratios get clipped at this multiple of their mean magnitude
+_SOFT_RANGE: Final[float] = 3.0
+
+
+class Viterbi:
+    _decision_bits: int = 1
 
-        y = GF2.Zeros(len(x))
+    def __call__(
+        self,
+        x: GF2,
+        valid: Optional[ndarray] = None,
+        length: Optional[ndarray] = None,
+    ) -> GF2:
+        if valid is None:
+            valid = np.full(x.shape, True)
 
-        path = np.full(len(x) + 1, -1)
-        path[-1] = 0
+        codewords = np.array(x, dtype=np.uint8)
+        valid = np.array(valid, dtype=np.bool).reshape(codewords.shape)
 
-        for i in range(len(y), 0, -1):
-            bit, new_path = self._reverse_step(cost[i], path[i])
+        branch_metric = self._branch_metric(
+            self._codewords(codewords, length),
+            self._codewords(valid, length),
+        )
 
-            y[i - 1] = bit
-            path[i - 1] = new_path
+        return bits_like(self._decode(branch_metric, length), x)
 
-        return y
+    def __init__(
+        self,
+        generator_matrix: GF2,
+        register_exchange: int = _REGISTER_EXCHANGE,
+    ) -> None:
+        assert register_exchange >= 0
+        assert register_exchange <= _REGISTER_EXCHANGE
 
-    def __init__(self, generator_matrix: GF2) -> None:
         self.generator_matrix = generator_matrix
+        self.register_exchange = register_exchange
 
         self.k = k = generator_matrix.shape[0]
         self.n = n = generator_matrix.shape[1]
@@ -56,71 +100,830 @@ class Viterbi:
         # we only support 2-bit convolutional codes
         assert n == 2
 
-        self.states = states = 1 << (k - 1)
+        self.states = 1 << (k - 1)
+
+        t = trellis(*matrix2poly(generator_matrix))
+
+        self._input = t.input
+        self._previous = t.previous
+        self._symbol = t.symbol
+
+    def _branch_metric(self, x: ndarray, valid: ndarray) -> ndarray:
+        x = np.packbits(x, axis=-1, bitorder=_BITORDER)
+        valid = np.packbits(valid, axis=-1, bitorder=_BITORDER)
+
+        symbols = np.arange(1 << self.n, dtype=np.uint8)
+
+        return np.bitwise_count((symbols ^ x) & valid).astype(np.int64)
+
+    def _codewords(
+        self,
+        x: ndarray,
+        length: Optional[ndarray] = None,
+    ) -> ndarray:
+        # the last axis is always one coded bit stream, the (steps, n) output
+        # of ConvolutionalEncoder has to be flattened first, without a length
+        # it would silently decode as a batch of single step codewords
+        assert length is not None or x.ndim < 2 or x.shape[-1] != self.n
+
+        return x.reshape(x.shape[:-1] + (x.shape[-1] // self.n, self.n))
+
+    def _decode(
+        self,
+        branch_metric: ndarray,
+        length: Optional[ndarray] = None,
+    ) -> ndarray:
+        shape = branch_metric.shape[:-2]
+
+        length = self._length(branch_metric, length)
+
+        branch_metric = branch_metric.reshape(
+            (len(length),) + branch_metric.shape[-2:]
+        )
+
+        metric = self._metric(len(branch_metric))
+
+        if branch_metric.shape[-2] <= self.register_exchange:
+            y = self._register_exchange(
+                branch_metric, metric, length // self.n
+            )
+
+        else:
+            decisions, _ = self._forward(branch_metric, metric)
+
+            state = np.zeros(len(branch_metric), dtype=np.int64)
+
+            y = self._traceback(decisions, state, length // self.n)
+
+        return y.reshape(shape + y.shape[-1:])
+
+    def _forward(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        branch_metric = np.moveaxis(branch_metric, -2, 0)
+
+        decisions = np.empty(
+            branch_metric.shape[:-1]
+            + (-(-self.states * self._decision_bits // 8),),
+            dtype=np.uint8,
+        )
+
+        for i, branch_metric_i in enumerate(branch_metric):
+            decision, metric = self._forward_step(branch_metric_i, metric)
+
+            decisions[i] = np.packbits(decision, axis=-1, bitorder=_BITORDER)
+
+        return decisions, metric
+
+    def _forward_step(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        path_metric = metric[:, self._previous]
+        path_metric += branch_metric[:, self._symbol]
+
+        decision = path_metric[..., 1] < path_metric[..., 0]
+
+        return decision, np.where(
+            decision,
+            path_metric[..., 1],
+            path_metric[..., 0],
+        )
+
+    def _length(
+        self,
+        branch_metric: ndarray,
+        length: Optional[ndarray],
+    ) -> ndarray:
+        shape = branch_metric.shape[:-2]
+        steps = branch_metric.shape[-2]
+
+        if length is None:
+            length = steps * self.n
+
+        length = np.broadcast_to(length, shape).reshape(-1)
+
+        assert np.all(length % self.n == 0)
+        assert np.all(length <= steps * self.n)
+
+        return length
+
+    def _metric(self, batch: int) -> ndarray:
+        metric = np.full((batch, self.states), _UNREACHABLE, dtype=np.int64)
+        metric[:, 0] = 0
+
+        return metric
+
+    def _register_exchange(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+        steps: ndarray,
+    ) -> ndarray:
+        # two paths into a state only differ in bits older than the state,
+        # the oldest of which is the top bit of the previous state, so
+        # comparing whole words breaks ties towards the lower previous state
+        word = metric.astype(np.int64)
+        word = np.minimum(word, _REGISTER_EXCHANGE_UNREACHABLE)
+        word <<= _REGISTER_EXCHANGE
+
+        increment = np.moveaxis(branch_metric[..., self._symbol], 1, 0)
+        increment = increment.astype(np.int64) << _REGISTER_EXCHANGE
+        increment |= (
+            self._input.astype(np.int64)[:, None]
+            << np.arange(len(increment))[:, None, None, None]
+        )
+
+        ends = set(steps.tolist())
+
+        y = np.zeros(len(metric), dtype=np.int64)
+
+        for i, increment_i in enumerate(increment):
+            path = np.take(word, self._previous, axis=-1)
+            path += increment_i
+
+            word = np.minimum(path[..., 0], path[..., 1])
+
+            # terminated frames end in the zero state
+            if i + 1 in ends:
+                done = steps == i + 1
+                y[done] = word[done, 0]
+
+        y = np.unpackbits(
+            y.astype("<i8").view(np.uint8).reshape(len(y), -1),
+            axis=-1,
+            bitorder=_BITORDER,
+        )
+
+        return y[:, : branch_metric.shape[-2]]
+
+    def _traceback(
+        self,
+        decisions: ndarray,
+        state: ndarray,
+        steps: ndarray,
+    ) -> ndarray:
+        y = np.zeros((len(state), len(decisions)), dtype=np.uint8)
+
+        if len(state) == 1:
+            y[0, : steps[0]] = self._traceback_single(
+                decisions[: steps[0], 0],
+                int(state[0]),
+            )
+
+            return y
+
+        batch = np.arange(len(state))
 
-        states = GF2.Zeros((states, k))
-        states[:, 1:] = GF2(
+        for i in range(len(decisions) - 1, -1, -1):
+            active = i < steps
+
+            y[:, i] = self._input[state] & active
+
+            decision = decisions[i, batch, state >> 3] >> (state & 0x7)
+            decision &= 1
+
+            state = np.where(active, self._previous[state, decision], state)
+
+        return y
+
+    def _traceback_single(self, decisions: ndarray, state: int) -> ndarray:
+        y = np.zeros(len(decisions), dtype=np.uint8)
+
+        decisions = decisions.tolist()
+        previous = self._previous.tolist()
+        inputs = self._input.tolist()
+
+        for i in range(len(y) - 1, -1, -1):
+            y[i] = inputs[state]
+
+            decision = (decisions[i][state >> 3] >> (state & 0x7)) & 1
+
+            state = previous[state][decision]
+
+        return y
+
+
+class BitslicedViterbi(Viterbi):
+    def __call__(
+        self,
+        x: GF2,
+        valid: Optional[ndarray] = None,
+        length: Optional[ndarray] = None,
+    ) -> GF2:
+        if valid is None:
+            valid = np.full(x.shape, True)
+
+        codewords = np.array(x, dtype=np.uint8)
+        valid = np.array(valid, dtype=np.bool).reshape(codewords.shape)
+
+        codewords = self._codewords(codewords, length)
+        valid = self._codewords(valid, length)
+
+        shape = codewords.shape[:-2]
+
+        length = self._length(codewords, length)
+
+        codewords = codewords.reshape((len(length),) + codewords.shape[-2:])
+        valid = valid.reshape(codewords.shape)
+
+        decisions = self._forward_sliced(
+            self._branch_metric_sliced(
+                self._slice(codewords),
+                self._slice(valid),
+            )
+        )
+
+        state = np.zeros(len(codewords), dtype=np.int64)
+
+        y = self._traceback(decisions, state, length // self.n)
+
+        return bits_like(y.reshape(shape + y.shape[-1:]), x)
+
+    def __init__(self, generator_matrix: GF2) -> None:
+        super().__init__(generator_matrix)
+
+        # path metrics of all states stay within n * (k - 1) of each other,
+        # keeping them modulo more than four times n * k leaves the sign of
+        # the difference of any two candidates unambiguous, unreachable
+        # states start a quarter of the modulus above the zero state
+        self.planes = (self.n * self.k).bit_length() + 2
+
+        symbols = np.arange(1 << self.n, dtype=np.uint8)
+        symbols = np.array(unpackbits(symbols, count=self.n), dtype=np.bool)
+
+        self._symbol_mask = np.where(symbols, ~np.uint64(0), np.uint64(0))
+
+    def _branch_metric_sliced(self, x: ndarray, valid: ndarray) -> ndarray:
+        error = x[:, None] ^ self._symbol_mask[..., None]
+        error &= valid[:, None]
+
+        # the Hamming weight of two bits as a two bit-plane number
+        return np.stack(
             [
-                galois.Poly.Int(i, field=GF2).coefficients(k - 1, "asc")
-                for i in range(states.shape[0])
-            ]
+                error[:, :, 0] ^ error[:, :, 1],
+                error[:, :, 0] & error[:, :, 1],
+            ],
+            axis=1,
+        )
+
+    def _forward_sliced(self, branch_metric: ndarray) -> ndarray:
+        metric = np.zeros(
+            (self.planes, self.states, branch_metric.shape[-1]),
+            dtype=np.uint64,
+        )
+        metric[-2, 1:] = ~np.uint64(0)
+
+        decisions = np.empty(
+            (len(branch_metric), self.states, branch_metric.shape[-1]),
+            dtype=np.uint64,
+        )
+
+        for i, branch_metric_i in enumerate(branch_metric):
+            branch_metric_i = branch_metric_i[:, self._symbol]
+
+            path_metric = metric[:, self._previous]
+
+            carry = path_metric[0] & branch_metric_i[0]
+            path_metric[0] ^= branch_metric_i[0]
+
+            plane = path_metric[1] ^ branch_metric_i[1]
+            carry, path_metric[1] = (
+                path_metric[1] & branch_metric_i[1] | carry & plane,
+                plane ^ carry,
+            )
+
+            for plane in path_metric[2:]:
+                plane_carry = plane & carry
+                plane ^= carry
+                carry = plane_carry
+
+            # the sign of the modular difference of both candidates
+            a = path_metric[:, :, 1]
+            b = path_metric[:, :, 0]
+
+            borrow = ~a[0] & b[0]
+
+            for a_i, b_i in zip(a[1:-1], b[1:-1]):
+                borrow = ~a_i & b_i | ~(a_i ^ b_i) & borrow
+
+            decision = a[-1] ^ b[-1] ^ borrow
+
+            metric = b ^ (a ^ b) & decision
+
+            decisions[i] = decision
+
+        return decisions
+
+    def _slice(self, x: ndarray) -> ndarray:
+        x = np.moveaxis(x, 0, -1)
+        x = np.pad(x, ((0, 0), (0, 0), (0, -x.shape[-1] % _BITSLICE_LANES)))
+
+        x = np.packbits(x, axis=-1, bitorder=_BITORDER)
+
+        return x.view(_BITSLICE_DTYPE).astype(np.uint64)
+
+    def _traceback(
+        self,
+        decisions: ndarray,
+        state: ndarray,
+        steps: ndarray,
+    ) -> ndarray:
+        y = np.zeros((len(state), len(decisions)), dtype=np.uint8)
+
+        lane = np.arange(len(state))
+        word = lane // _BITSLICE_LANES
+        lane = (lane % _BITSLICE_LANES).astype(np.uint64)
+
+        for i in range(len(decisions) - 1, -1, -1):
+            active = i < steps
+
+            y[:, i] = self._input[state] & active
+
+            decision = decisions[i, state, word] >> lane
+            decision &= np.uint64(1)
+
+            state = np.where(
+                active,
+                self._previous[state, decision.astype(np.int64)],
+                state,
+            )
+
+        return y
+
+
+class ParallelViterbi(Viterbi):
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        # worker processes receive the decoder, never the pool that feeds it
+        state = self.__dict__.copy()
+        state["_pool"] = None
+
+        return state
+
+    def __init__(
+        self,
+        generator_matrix: GF2,
+        *,
+        block: Optional[int] = None,
+        margin: Optional[int] = None,
+        processes: bool = False,
+        workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(generator_matrix)
+
+        if margin is None:
+            margin = _PARALLEL_MARGIN * self.k
+
+        if workers is None:
+            workers = os.cpu_count()
+
+        assert block is None or block > 0
+        assert margin >= 0
+        assert workers > 0
+
+        self.block = block
+        self.margin = margin
+        self.processes = processes
+        self.workers = workers
+
+        self._pool = None
+
+    def _decode(
+        self,
+        branch_metric: ndarray,
+        length: Optional[ndarray] = None,
+    ) -> ndarray:
+        shape = branch_metric.shape[:-2]
+        steps = branch_metric.shape[-2]
+
+        length = self._length(branch_metric, length)
+
+        branch_metric = branch_metric.reshape(
+            (len(length),) + branch_metric.shape[-2:]
         )
 
-        zero_branch = packbits(np.array(states[:, :-1]))
-        zero_expected = states @ generator_matrix
+        y = np.zeros((len(branch_metric), steps), dtype=np.uint8)
+
+        pool = self._get_pool()
+
+        # processes already hold a copy of the decoder, threads share it
+        decode_block = (
+            _decode_parallel_block if self.processes else self._decode_block
+        )
+
+        blocks = []
+
+        for i, steps_i in enumerate(length // self.n):
+            block = self.block
+
+            if block is None:
+                block = max(-(-steps_i // self.workers), 1)
+
+            for start in range(0, steps_i, block):
+                stop = min(start + block, steps_i)
 
-        states[:, 0] = 1
+                head = max(start - self.margin, 0)
+                tail = min(stop + self.margin, steps_i)
 
-        one_branch = packbits(np.array(states[:, :-1]))
-        one_expected = states @ generator_matrix
+                future = pool.submit(
+                    decode_block,
+                    branch_metric[i, head:tail],
+                    head == 0,
+                    tail == steps_i,
+                )
 
-        self._branch = np.stack([zero_branch, one_branch])
-        self._expected = np.stack([zero_expected, one_expected])
+                blocks.append((i, start - head, start, stop, future))
 
-    def _forward_step(self, x: GF2, valid: ndarray, cost: ndarray) -> GF2:
-        cost = reduce(cost, "input state branch -> state", "min")
+        for i, offset, start, stop, future in blocks:
+            y[i, start:stop] = future.result()[offset:][: stop - start]
 
-        branch_metric = np.array(self._expected ^ x)
-        branch_metric = reduce(
-            branch_metric * valid,
-            "input state bits -> input state",
-            "sum",
+        return y.reshape(shape + (steps,))
+
+    def _decode_block(
+        self,
+        branch_metric: ndarray,
+        first: bool,
+        last: bool,
+    ) -> ndarray:
+        # blocks that do not start the codeword warm up from an unknown state
+        metric = self._metric(1)
+
+        if not first:
+            metric[...] = 0
+
+        decisions, metric = self._forward(branch_metric[None], metric)
+
+        state = np.argmin(metric, axis=-1)
+
+        if last:
+            state[...] = 0
+
+        return self._traceback(decisions, state, [len(decisions)])[0]
+
+    def _get_pool(self) -> Executor:
+        if self._pool is not None:
+            return self._pool
+
+        # threads only overlap while numpy releases the gil, which takes
+        # blocks long enough for the per-step work to outweigh the dispatch
+        if self.processes:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_initialize_parallel_worker,
+                initargs=(self,),
+            )
+
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+
+        self._pool.shutdown()
+        self._pool = None
+
+
+class Radix4Viterbi(Viterbi):
+    _decision_bits: int = 2
+
+    def __init__(self, generator_matrix: GF2) -> None:
+        super().__init__(generator_matrix)
+
+        # candidates are ordered by the decision of the second step first
+        # so the first minimum is the survivor two radix-2 steps would pick
+        middle = self._previous
+        previous = self._previous[middle]
+
+        symbol = self._symbol[middle] << self.n
+        symbol |= self._symbol[:, :, None]
+
+        self._middle = middle
+        self._previous4 = previous.reshape(self.states, 4)
+        self._symbol4 = symbol.reshape(self.states, 4)
+
+        # forces a trailing zero input into the zero state to even out odd
+        # codewords, every other branch out of the zero state is ruled out
+        self._terminate = np.full(1 << self.n, _UNREACHABLE, dtype=np.int64)
+        self._terminate[self._symbol[0, 0]] = 0
+
+        assert self._previous[0, 0] == 0
+        assert self._symbol[0, 1] != self._symbol[0, 0]
+
+    def _decode(
+        self,
+        branch_metric: ndarray,
+        length: Optional[ndarray] = None,
+    ) -> ndarray:
+        shape = branch_metric.shape[:-2]
+        steps = branch_metric.shape[-2]
+
+        length = self._length(branch_metric, length)
+
+        branch_metric = branch_metric.reshape(
+            (len(length),) + branch_metric.shape[-2:]
+        )
+
+        odd = (length // self.n) % 2 == 1
+
+        branch_metric = np.pad(branch_metric, ((0, 0), (0, steps % 2), (0, 0)))
+        branch_metric[odd, length[odd] // self.n] = self._terminate
+
+        metric = self._metric(len(branch_metric))
+
+        decisions, _ = self._forward(branch_metric, metric)
+
+        state = np.zeros(len(branch_metric), dtype=np.int64)
+
+        y = self._traceback(decisions, state, -(-length // (2 * self.n)))
+        y[odd, length[odd] // self.n] = 0
+        y = y[:, :steps]
+
+        return y.reshape(shape + y.shape[-1:])
+
+    def _forward(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        branch_metric = (
+            branch_metric[:, 0::2, :, None] + branch_metric[:, 1::2, None, :]
+        )
+        branch_metric = branch_metric.reshape(
+            branch_metric.shape[:2] + (1 << (2 * self.n),)
         )
-        path_metric = branch_metric + cost
 
-        branch = self._branch
-        new_cost = np.full((self.n, self.states, self.states), np.inf)
+        return super()._forward(branch_metric, metric)
+
+    def _forward_step(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        path_metric = metric[:, self._previous4]
+        path_metric += branch_metric[:, self._symbol4]
 
-        for n in range(self.n):
-            for s in range(self.states):
-                new_cost[n, branch[n, s], s] = path_metric[n, s]
+        low = path_metric[..., 1] < path_metric[..., 0]
+        high = path_metric[..., 3] < path_metric[..., 2]
 
-        return new_cost
+        low_metric = np.where(low, path_metric[..., 1], path_metric[..., 0])
+        high_metric = np.where(high, path_metric[..., 3], path_metric[..., 2])
 
-    def _reverse_step(
+        decision = high_metric < low_metric
+
+        # the first bit plane holds the decisions of the first step and the
+        # second bit plane the decisions of the second step
+        return np.concatenate(
+            [np.where(decision, high, low), decision],
+            axis=-1,
+        ), np.where(decision, high_metric, low_metric)
+
+    def _traceback(
         self,
-        cost: ndarray,
+        decisions: ndarray,
         state: ndarray,
-    ) -> tuple[GF2, ndarray]:
-        previous_state = np.argmin(cost[..., state, :], axis=-1)
+        steps: ndarray,
+    ) -> ndarray:
+        y = np.zeros((len(state), 2 * len(decisions)), dtype=np.uint8)
+
+        if len(state) == 1:
+            y[0, : 2 * steps[0]] = self._traceback_single(
+                decisions[: steps[0], 0],
+                int(state[0]),
+            )
+
+            return y
+
+        batch = np.arange(len(state))
+
+        for i in range(len(decisions) - 1, -1, -1):
+            active = i < steps
+
+            first = decisions[i, batch, state >> 3] >> (state & 0x7)
+            first &= 1
+
+            second = state + self.states
+            second = decisions[i, batch, second >> 3] >> (second & 0x7)
+            second &= 1
+
+            middle = self._middle[state, second]
+
+            y[:, 2 * i + 1] = self._input[state] & active
+            y[:, 2 * i] = self._input[middle] & active
+
+            state = np.where(active, self._previous[middle, first], state)
+
+        return y
+
+    def _traceback_single(self, decisions: ndarray, state: int) -> ndarray:
+        y = np.zeros(2 * len(decisions), dtype=np.uint8)
+
+        decisions = decisions.tolist()
+        middle = self._middle.tolist()
+        previous = self._previous.tolist()
+        inputs = self._input.tolist()
+
+        for i in range(len(decisions) - 1, -1, -1):
+            first = (decisions[i][state >> 3] >> (state & 0x7)) & 1
+
+            second = state + len(inputs)
+            second = (decisions[i][second >> 3] >> (second & 0x7)) & 1
+
+            middle_state = middle[state][second]
+
+            y[2 * i + 1] = inputs[state]
+            y[2 * i] = inputs[middle_state]
+
+            state = previous[middle_state][first]
+
+        return y
+
+
+class SoftViterbi(Viterbi):
+    # log-likelihood ratios are ln(P(b = 1) / P(b = 0)), matching our
+    # constellations which map a one onto the positive axis
+    def __call__(
+        self,
+        x: ndarray,
+        length: Optional[ndarray] = None,
+        *,
+        gf2: bool = True,
+    ) -> GF2:
+        x = self._quantize(self._codewords(np.asarray(x), length))
+
+        return bits(self._decode(self._branch_metric(x), length), gf2=gf2)
+
+    def __init__(self, generator_matrix: GF2, bits: int = 8) -> None:
+        super().__init__(generator_matrix)
+
+        assert bits >= 2
+        assert bits <= 8
+
+        self.bits = bits
+
+        symbols = np.arange(1 << self.n, dtype=np.uint8)
+        symbols = unpackbits(symbols, count=self.n)
+
+        self._sign = 1 - 2 * np.array(symbols, dtype=np.int16)
+
+    def _branch_metric(
+        self,
+        x: ndarray,
+        valid: Optional[ndarray] = None,
+    ) -> ndarray:
+        x = x[..., None, :].astype(np.int16)
+
+        return np.sum(np.maximum(x * self._sign, 0), axis=-1, dtype=np.int16)
+
+    def _forward(
+        self,
+        branch_metric: ndarray,
+        metric: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        decisions = []
+
+        for i in range(0, branch_metric.shape[-2], _SOFT_NORMALIZE):
+            decision, metric = super()._forward(
+                branch_metric[..., i : i + _SOFT_NORMALIZE, :],
+                metric,
+            )
+
+            metric -= np.min(metric, axis=-1, keepdims=True)
+            metric = np.minimum(metric, _SOFT_UNREACHABLE, out=metric)
+
+            decisions.append(decision)
+
+        return np.concatenate(decisions), metric
+
+    def _metric(self, batch: int) -> ndarray:
+        metric = np.full(
+            (batch, self.states),
+            _SOFT_UNREACHABLE,
+            dtype=np.int16,
+        )
+        metric[:, 0] = 0
+
+        return metric
+
+    def _quantize(self, x: ndarray) -> ndarray:
+        limit = (1 << (self.bits - 1)) - 1
+
+        # an empty codeword has no magnitude to scale by
+        count = max(x.shape[-2] * x.shape[-1], 1)
+
+        magnitude = np.sum(np.abs(x), axis=(-2, -1), keepdims=True) / count
+        magnitude[magnitude == 0] = np.inf
+
+        x = np.rint(x * (limit / (_SOFT_RANGE * magnitude)))
 
-        bit = np.zeros(self.n, dtype=cost.dtype)
+        return np.clip(x, -limit, limit).astype(np.int8)
 
-        for i, p in enumerate(previous_state):
-            bit[i] = cost[i, state, p]
 
-        bit = GF2(np.argmin(bit))
+class StreamingViterbi(Viterbi):
+    def __call__(self, x: GF2, valid: Optional[ndarray] = None) -> GF2:
+        if valid is None:
+            valid = np.full(x.shape, True)
+
+        self._gf2 = isinstance(x, GF2)
+
+        x = np.concatenate([self._x, np.array(x, dtype=np.uint8).flatten()])
+        valid = np.concatenate(
+            [self._valid, np.array(valid, dtype=np.bool).flatten()]
+        )
+
+        steps = len(x) // self.n
+
+        self._x = x[steps * self.n :]
+        self._valid = valid[steps * self.n :]
+
+        x = x[: steps * self.n].reshape(1, steps, self.n)
+        valid = valid[: steps * self.n].reshape(x.shape)
+
+        decisions, metric = self._forward(
+            self._branch_metric(x, valid),
+            self._path_metric,
+        )
+
+        self._decisions = np.concatenate([self._decisions, decisions])
+        self._path_metric = metric - np.min(metric, axis=-1, keepdims=True)
+
+        decided = len(self._decisions) - self.depth
+
+        if decided <= 0:
+            return bits(np.zeros(0, dtype=np.uint8), gf2=self._gf2)
+
+        state = np.argmin(self._path_metric, axis=-1)
+
+        y = self._traceback(self._decisions, state, [len(self._decisions)])
+
+        self._decisions = self._decisions[decided:]
+
+        return bits(y[0, :decided], gf2=self._gf2)
+
+    def __init__(
+        self,
+        generator_matrix: GF2,
+        depth: Optional[int] = None,
+    ) -> None:
+        super().__init__(generator_matrix)
+
+        if depth is None:
+            depth = 5 * self.k
+
+        assert depth > 0
+
+        self.depth = depth
+
+        self.reset()
+
+    def flush(self) -> GF2:
+        assert not len(self._x)
+
+        state = np.zeros(1, dtype=np.int64)
+
+        y = self._traceback(self._decisions, state, [len(self._decisions)])
+
+        gf2 = self._gf2
+
+        self.reset()
+
+        return bits(y[0], gf2=gf2)
+
+    def reset(self) -> None:
+        self._gf2 = True
+        self._x = np.zeros(0, dtype=np.uint8)
+        self._valid = np.zeros(0, dtype=np.bool)
+
+        self._decisions = np.zeros(
+            (0, 1, -(-self.states // 8)),
+            dtype=np.uint8,
+        )
+
+        self._path_metric = self._metric(1)
 
-        return bit, previous_state[bit]
 
+def _decode_parallel_block(
+    branch_metric: ndarray,
+    first: bool,
+    last: bool,
+) -> ndarray:
+    return _PARALLEL_WORKER["decoder"]._decode_block(
+        branch_metric,
+        first,
+        last,
+    )
 
-def poly2matrix(polynomials: list[int], k: int) -> GF2:
-    assert k > 0
-    assert len(polynomials) >= 1
 
-    return GF2(
-        [
-            galois.Poly.Int(polynomial, field=GF2).coefficients(k, "asc")
-            for polynomial in polynomials
-        ]
-    ).T
+def _initialize_parallel_worker(decoder: ParallelViterbi) -> None:
+    _PARALLEL_WORKER["decoder"] = decoder
@@ -9,10 +9,21 @@ import pytest
 from galois import GF2
 from numpy.random import Generator
 
-from ppdu import ConvolutionalEncoder
+from ppdu import (
+    ConvolutionalEncoder,
+    GENERATOR_CONSTRAINT_LENGTH,
+    GENERATOR_POLYNOMIALS,
+    Puncturer,
+    rate_parameter,
+)
+from trellis import poly2matrix
 from viterbi import (
+    BitslicedViterbi,
+    ParallelViterbi,
+    Radix4Viterbi,
+    SoftViterbi,
+    StreamingViterbi,
     Viterbi,
-    poly2matrix,
 )
 
 
@@ -40,6 +51,12 @@ def test_viterbi(
 
     v = Viterbi(G)
 
+    # the (steps, n) encoder layout is ambiguous with a batch of codewords
+    with pytest.raises(AssertionError):
+        v(y)
+
+    y = y.flatten()
+
     bit_flips = rng.integers(0, random_count, k)
 
     y[bit_flips] ^= y[bit_flips]
@@ -47,3 +64,304 @@ def test_viterbi(
     decoded = v(y)
 
     assert not np.sum(np.array(x + decoded))
+
+
+def test_viterbi_punctured(
+    rng: Generator,
+    random_count: int,
+    rate: int,
+) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random(random_count + (-random_count % 36), seed=rng)
+    x[-(k - 1) :] = 0
+
+    c = ConvolutionalEncoder(G)
+    p = Puncturer(rate_parameter(rate).coding_rate)
+
+    y, valid = p.reverse(p.forward(c(x).flatten()))
+
+    v = Viterbi(G)
+
+    decoded = v(y, valid)
+
+    assert np.all(decoded == x)
+
+
+def test_viterbi_batch(rng: Generator, random_count: int) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    c = ConvolutionalEncoder(G)
+    v = Viterbi(G)
+
+    length = rng.integers(k, random_count // 8, 8)
+
+    x = GF2.Zeros((len(length), max(length)))
+    y = GF2.Zeros((len(length), 2 * max(length)))
+    valid = rng.random(y.shape) > 0.1
+
+    for i, length_i in enumerate(length):
+        x[i, :length_i] = GF2.Random(length_i, seed=rng)
+        x[i, length_i - (k - 1) : length_i] = 0
+
+        y[i, : 2 * length_i] = c(x[i, :length_i]).flatten()
+
+    decoded = v(y, valid, 2 * length)
+
+    assert decoded.shape == x.shape
+
+    for i, length_i in enumerate(length):
+        expected = v(y[i, : 2 * length_i], valid[i, : 2 * length_i])
+
+        assert np.all(decoded[i, :length_i] == expected)
+        assert not np.any(decoded[i, length_i:])
+
+    # a batch of single step codewords is not an encoder (steps, n) output
+    y = GF2.Random((len(length), 2), seed=rng)
+    valid = rng.random(y.shape) > 0.1
+
+    decoded = v(y, valid, np.full(len(y), 2))
+
+    assert decoded.shape == (len(y), 1)
+
+    for y_i, valid_i, decoded_i in zip(y, valid, decoded):
+        assert np.all(decoded_i == v(y_i, valid_i))
+
+
+@pytest.mark.parametrize(
+    "polynomials, k",
+    (
+        ((0b111, 0b101), 3),
+        ((0o133, 0o171), 7),
+    ),
+)
+def test_viterbi_bitsliced(
+    rng: Generator,
+    random_count: int,
+    polynomials: tuple[int, int],
+    k: int,
+) -> None:
+    G = poly2matrix(polynomials, k)
+
+    x = GF2.Random((130, random_count // 8), seed=rng)
+    x[:, -(k - 1) :] = 0
+
+    y = ConvolutionalEncoder(G)(x.flatten()).reshape(len(x), -1)
+
+    assert np.all(BitslicedViterbi(G)(y) == x)
+
+    y[rng.random(y.shape) < 0.05] ^= 1
+
+    valid = rng.random(y.shape) > 0.1
+
+    length = 2 * rng.integers(0, x.shape[-1] + 1, len(x))
+
+    assert np.all(
+        BitslicedViterbi(G)(y, valid, length) == Viterbi(G)(y, valid, length)
+    )
+
+
+@pytest.mark.parametrize(
+    "decoder",
+    [BitslicedViterbi, ParallelViterbi, Radix4Viterbi, SoftViterbi, Viterbi],
+)
+def test_viterbi_empty(decoder: type) -> None:
+    G = poly2matrix(GENERATOR_POLYNOMIALS, GENERATOR_CONSTRAINT_LENGTH)
+
+    v = decoder(G)
+
+    assert v(GF2.Zeros(0)).shape == (0,)
+    assert v(GF2.Zeros((3, 0))).shape == (3, 0)
+
+    if isinstance(v, ParallelViterbi):
+        v.close()
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 48])
+def test_viterbi_streaming(
+    rng: Generator,
+    random_count: int,
+    chunk: int,
+) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random(random_count, seed=rng)
+    x[-(k - 1) :] = 0
+
+    c = ConvolutionalEncoder(G)
+
+    y = c(x).flatten()
+
+    bit_flips = rng.integers(0, len(y), 4)
+
+    y[bit_flips] ^= 1
+
+    v = StreamingViterbi(G)
+
+    decoded = [v(y[i : i + chunk]) for i in range(0, len(y), chunk)]
+
+    assert max(map(len, decoded)) <= -(-chunk // 2)
+
+    decoded = np.concatenate(decoded + [v.flush()])
+
+    assert np.all(decoded == Viterbi(G)(y))
+
+
+def test_viterbi_soft(rng: Generator, random_count: int, rate: int) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random(random_count + (-random_count % 36), seed=rng)
+    x[-(k - 1) :] = 0
+
+    c = ConvolutionalEncoder(G)
+    p = Puncturer(rate_parameter(rate).coding_rate)
+
+    y, valid = p.reverse(p.forward(c(x).flatten()))
+
+    llr = 2.0 * np.array(y) - 1
+    llr += rng.normal(0, 0.5, llr.shape)
+    llr[~valid] = 0
+
+    v = SoftViterbi(G, bits=4)
+
+    assert np.all(v(llr) == x)
+
+    llr = np.stack([llr, np.sign(llr)])
+
+    hard = GF2((llr[1] > 0).astype(np.uint8))
+
+    decoded = SoftViterbi(G)(llr)
+
+    assert np.all(decoded[0] == x)
+    assert np.all(decoded[1] == Viterbi(G)(hard, valid))
+
+    plain = SoftViterbi(G)(llr, gf2=False)
+
+    assert not isinstance(plain, GF2)
+    assert plain.dtype == np.uint8
+    assert np.all(plain == decoded)
+
+
+def _test_viterbi_parallel(
+    rng: Generator,
+    count: int,
+    rate: int,
+    processes: bool,
+) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random(count + (-count % 36), seed=rng)
+    x[-(k - 1) :] = 0
+
+    c = ConvolutionalEncoder(G)
+    p = Puncturer(rate_parameter(rate).coding_rate)
+
+    y = p.forward(c(x).flatten())
+
+    bit_flips = rng.integers(0, len(y), 16)
+
+    y[bit_flips] ^= 1
+
+    y, valid = p.reverse(y)
+
+    expected = Viterbi(G)(y, valid)
+
+    with ParallelViterbi(
+        G,
+        block=512,
+        processes=processes,
+        workers=4,
+    ) as v:
+        assert np.all(v(y, valid) == expected)
+
+        pool = v._pool
+
+        assert np.all(v(y, valid) == expected)
+        assert v._pool is pool
+
+    assert v._pool is None
+
+
+def test_viterbi_parallel(
+    rng: Generator,
+    random_count: int,
+    rate: int,
+) -> None:
+    _test_viterbi_parallel(rng, 4 * random_count, rate, False)
+
+
+def test_viterbi_parallel_processes(
+    rng: Generator,
+    random_count: int,
+) -> None:
+    _test_viterbi_parallel(rng, 4 * random_count, 54, True)
+
+
+def test_viterbi_radix4(rng: Generator, random_count: int, rate: int) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random(random_count + (-random_count % 36), seed=rng)
+    x[-(k - 1) :] = 0
+
+    c = ConvolutionalEncoder(G)
+    p = Puncturer(rate_parameter(rate).coding_rate)
+
+    y = p.forward(c(x).flatten())
+
+    bit_flips = rng.integers(0, len(y), 8)
+
+    y[bit_flips] ^= 1
+
+    y, valid = p.reverse(y)
+
+    length = 2 * rng.integers(1, len(x), 4)
+    length[0] = len(y)
+    length[1] |= 2
+
+    y = GF2(np.broadcast_to(y, (len(length),) + y.shape))
+    valid = np.broadcast_to(valid, y.shape)
+
+    assert np.all(
+        Radix4Viterbi(G)(y, valid, length) == Viterbi(G)(y, valid, length)
+    )
+
+    y = y[0, :-2]
+    valid = valid[0, :-2]
+
+    assert np.all(Radix4Viterbi(G)(y, valid) == Viterbi(G)(y, valid))
+
+
+def test_viterbi_register_exchange(rng: Generator) -> None:
+    k = GENERATOR_CONSTRAINT_LENGTH
+
+    G = poly2matrix(GENERATOR_POLYNOMIALS, k)
+
+    x = GF2.Random((16, 32), seed=rng)
+    x[:, -(k - 1) :] = 0
+
+    y = ConvolutionalEncoder(G)(x.flatten()).reshape(len(x), -1)
+
+    assert np.all(Viterbi(G)(y) == x)
+
+    y[rng.random(y.shape) < 0.05] ^= 1
+
+    valid = rng.random(y.shape) > 0.1
+
+    length = 2 * rng.integers(0, x.shape[-1] + 1, len(x))
+
+    assert np.all(
+        Viterbi(G)(y, valid, length)
+        == Viterbi(G, register_exchange=0)(y, valid, length)
+    )
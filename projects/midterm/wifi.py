@@ -11,22 +11,27 @@ import ppdu
 from math import ceil
 from typing import (
     Final,
+    Iterator,
     Optional,
 )
 
 from galois import GF2
 from numpy import ndarray
 from numpy.random import Generator
+from numpy.typing import DTypeLike
 
 from bit import (
+    bits,
     packbits,
     unpackbits,
 )
 from modulate import (
     demodulate,
+    demodulate_soft,
     modulate,
 )
 from ofdm import (
+    FFTBackend,
     FRAME_SIZE,
     LONG_TRAINING_SIZE,
     LONG_TRAINING_SYMBOLS,
@@ -46,20 +51,24 @@ from ppdu import (
     GENERATOR_CONSTRAINT_LENGTH,
     GENERATOR_POLYNOMIALS,
     Interleaver,
-    Puncturer,
+    PuncturedEncoder,
+    SCRAMBLER_SEED_INVALID,
     SCRAMBLER_SERVICE_BITS,
     SERVICE_BITS,
     Scrambler,
     Signal,
     decode_signal,
+    deinterleave_depuncture,
     encode_signal,
+    scrambler_seed,
 )
+from trellis import poly2matrix
 from viterbi import (
+    SoftViterbi,
+    StreamingViterbi,
     Viterbi,
-    poly2matrix,
 )
 
-
 TAIL_BITS: Final[int] = 6
 
 
@@ -78,44 +87,27 @@ def _chunk_data(x: GF2, cbps: int) -> GF2:
     return x.reshape(-1, cbps)
 
 
+def _correct_frequency_offset(x: ndarray, offset: ndarray) -> ndarray:
+    # the phase ramp is built in the precision of the samples it rotates
+    n = np.arange(x.size, dtype=x.real.dtype)
+
+    x *= np.exp(-1j * offset * n)
+
+    return x
+
+
 class Rx:
     def __call__(
         self,
         x: ndarray,
         signal: Optional[Signal] = None,
     ) -> Optional[ndarray]:
-        short_training_sequence = x[:SHORT_TRAINING_SIZE]
-
-        coarse_offset = carrier_frequency_offset(
-            short_training_sequence,
-            SHORT_TRAINING_SYMBOL_SAMPLES,
-            SHORT_TRAINING_SYMBOLS - 1,
-        )
-
-        x *= np.exp(-1j * coarse_offset * np.arange(x.size))
-        x = x[SHORT_TRAINING_SIZE:]
-
-        long_training_sequence = remove_circular_prefix(x[:LONG_TRAINING_SIZE])
-
-        fine_offset = carrier_frequency_offset(
-            long_training_sequence,
-            LONG_TRAINING_SYMBOL_SAMPLES,
-            LONG_TRAINING_SYMBOLS - 1,
-        )
-
-        x *= np.exp(-1j * fine_offset * np.arange(x.size))
-        x = x[LONG_TRAINING_SIZE:]
+        x = self._synchronize(x)
 
         data = x[FRAME_SIZE:]
 
         if signal is None:
-            signal = x[:FRAME_SIZE]
-
-            signal = self._ofdm_demodulate(signal)
-            signal = self._demodulate(signal, 6)
-            signal = self._deinterleave(signal, 6)
-            signal = self._apply_viterbi_decoder(signal)
-            signal = decode_signal(signal)
+            signal = self._decode_signal(x[:FRAME_SIZE])
 
             if signal is None:
                 return None
@@ -123,31 +115,56 @@ class Rx:
         self._update_state(signal)
 
         data = self._ofdm_demodulate(data)
-        data = self._demodulate(data)
-        data = self._deinterleave(data)
 
-        valid = GF2.Ones(data.shape)
-        valid = self._depuncture(valid)
-        valid = np.array(valid).astype(np.bool)
+        if self.soft:
+            data = self._demodulate_soft(data)
+            data, _ = self._deinterleave_depuncture(data)
+            data = self._apply_soft_viterbi_decoder(data)
+
+        else:
+            data = self._demodulate(data)
+            data, valid = self._deinterleave_depuncture(data)
+            data = self._apply_viterbi_decoder(data, valid)
 
-        data = self._depuncture(data)
-        data = self._apply_viterbi_decoder(data, valid)
         state = self._estimate_scrambler_state(data[:SCRAMBLER_SERVICE_BITS])
+
+        if state is None:
+            return None
+
         data = self._descramble(data, state)
 
         y = self._decode(data)
 
         return y
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        gf2: bool = True,
+        soft: bool = False,
+        dtype: DTypeLike = np.complex128,
+        fft_backend: Optional[FFTBackend] = None,
+    ) -> None:
+        self.gf2 = gf2
+        self.soft = soft
+        self.dtype = np.dtype(dtype)
+        self.fft_backend = fft_backend
+
         generator_matrix = poly2matrix(
             GENERATOR_POLYNOMIALS,
             GENERATOR_CONSTRAINT_LENGTH,
         )
         self.decoder = Viterbi(generator_matrix)
+        self.soft_decoder = SoftViterbi(generator_matrix)
+        self.streaming_decoder = StreamingViterbi(generator_matrix)
 
         self.scrambler = Scrambler(0)
 
+    def _apply_soft_viterbi_decoder(self, x: ndarray) -> GF2:
+        # punctured bits were zero filled, which is exactly an uninformative
+        # log-likelihood ratio
+        return self.soft_decoder(x, gf2=self.gf2)
+
     def _apply_viterbi_decoder(
         self,
         x: GF2,
@@ -162,6 +179,14 @@ class Rx:
 
         return y
 
+    def _decode_signal(self, x: ndarray) -> Optional[Signal]:
+        signal = self._ofdm_demodulate(x)
+        signal = self._demodulate(signal, 6)
+        signal = self._deinterleave(signal, 6)
+        signal = self._apply_viterbi_decoder(signal)
+
+        return decode_signal(signal)
+
     def _deinterleave(self, x: GF2, rate: Optional[int] = None) -> GF2:
         if rate is None:
             rate = self._rate
@@ -179,6 +204,14 @@ class Rx:
 
         return y.flatten()
 
+    def _deinterleave_depuncture(self, x: GF2) -> tuple[ndarray, ndarray]:
+        return deinterleave_depuncture(
+            x,
+            bpsc=self._bpsc,
+            cbps=self._cbps,
+            coding_rate=self._coding_rate,
+        )
+
     def _demodulate(self, x: GF2, rate: Optional[int] = None) -> ndarray:
         if rate is None:
             rate = self._rate
@@ -187,12 +220,10 @@ class Rx:
 
         x = demodulate(x, rate)
 
-        return unpackbits(x, count=bpsc).flatten()
+        return unpackbits(x, count=bpsc, gf2=self.gf2).flatten()
 
-    def _depuncture(self, x: GF2) -> GF2:
-        puncturer = Puncturer(self._coding_rate)
-
-        return puncturer.reverse(x)
+    def _demodulate_soft(self, x: ndarray) -> ndarray:
+        return demodulate_soft(x, self._rate).flatten()
 
     def _descramble(self, data: GF2, state: int) -> ndarray:
         self.scrambler.seed(state)
@@ -205,16 +236,11 @@ class Rx:
 
         return descrambled
 
-    def _estimate_scrambler_state(self, service: GF2) -> int:
-        zeros = GF2.Zeros(service.shape)
-
-        for state in range(1, 1 << (Scrambler.k - 1)):
-            self.scrambler.seed(state)
-
-            descrambled = self.scrambler(service)
+    def _estimate_scrambler_state(self, service: GF2) -> Optional[int]:
+        state = int(scrambler_seed(service))
 
-            if np.all(descrambled == zeros):
-                break
+        if state == SCRAMBLER_SEED_INVALID:
+            return None
 
         return state
 
@@ -223,7 +249,33 @@ class Rx:
         x = unapply_window(x)
         x = remove_circular_prefix(x)
 
-        return ofdm.demodulate(x).flatten()
+        return ofdm.demodulate(x, backend=self.fft_backend).flatten()
+
+    def _synchronize(self, x: ndarray) -> ndarray:
+        x = np.asarray(x, dtype=self.dtype)
+
+        short_training_sequence = x[:SHORT_TRAINING_SIZE]
+
+        coarse_offset = carrier_frequency_offset(
+            short_training_sequence,
+            SHORT_TRAINING_SYMBOL_SAMPLES,
+            SHORT_TRAINING_SYMBOLS - 1,
+        )
+
+        x = _correct_frequency_offset(x, coarse_offset)
+        x = x[SHORT_TRAINING_SIZE:]
+
+        long_training_sequence = remove_circular_prefix(x[:LONG_TRAINING_SIZE])
+
+        fine_offset = carrier_frequency_offset(
+            long_training_sequence,
+            LONG_TRAINING_SYMBOL_SAMPLES,
+            LONG_TRAINING_SYMBOLS - 1,
+        )
+
+        x = _correct_frequency_offset(x, fine_offset)
+
+        return x[LONG_TRAINING_SIZE:]
 
     def _update_state(self, signal: Signal) -> None:
         self._rate = signal.rate
@@ -240,16 +292,90 @@ class Rx:
         self._n_data = _calculate_data_bits(self._length, self._dbps)
         self._n_pad = _calculate_pad_bits(self._length, self._n_data)
 
+    def stream(
+        self,
+        x: ndarray,
+        signal: Optional[Signal] = None,
+    ) -> Iterator[ndarray]:
+        x = self._synchronize(x)
+
+        data = x[FRAME_SIZE:]
+
+        if signal is None:
+            signal = self._decode_signal(x[:FRAME_SIZE])
+
+            if signal is None:
+                return
+
+        self._update_state(signal)
+
+        decoder = self.streaming_decoder
+        decoder.reset()
+
+        scrambled = bits(np.zeros(0, dtype=np.uint8), gf2=self.gf2)
+        descrambled = bits(np.zeros(0, dtype=np.uint8), gf2=self.gf2)
+
+        seeded = False
+        service = SERVICE_BITS
+        remaining = 8 * self._length
+
+        symbols = data.reshape(-1, FRAME_SIZE)
+
+        for i, symbol in enumerate(symbols):
+            symbol = self._ofdm_demodulate(symbol)
+            symbol = self._demodulate(symbol)
+            symbol, valid = self._deinterleave_depuncture(symbol)
+
+            decoded = decoder(symbol, valid)
+
+            if i == len(symbols) - 1:
+                decoded = np.concatenate([decoded, decoder.flush()])
+
+            scrambled = np.concatenate([scrambled, decoded])
+
+            if not seeded:
+                if len(scrambled) < SCRAMBLER_SERVICE_BITS:
+                    continue
+
+                state = self._estimate_scrambler_state(
+                    scrambled[:SCRAMBLER_SERVICE_BITS]
+                )
+
+                if state is None:
+                    return
+
+                self.scrambler.seed(state)
+
+                seeded = True
+
+            if not len(scrambled):
+                continue
+
+            decoded = self.scrambler(scrambled).reshape(-1)
+            scrambled = scrambled[:0]
+
+            skip = min(service, len(decoded))
+            service -= skip
+
+            descrambled = np.concatenate([descrambled, decoded[skip:]])
+
+            count = min(len(descrambled), remaining) // 8 * 8
+
+            if not count:
+                continue
+
+            yield packbits(descrambled[:count].reshape(-1, 8))
+
+            descrambled = descrambled[count:]
+            remaining -= count
+
 
 class Tx:
     def __call__(self, x: ndarray, rate: int) -> ndarray:
         self._update_state(x, rate)
 
-        short_training_sequence = apply_window(ofdm.short_training_sequence())
-        long_training_sequence = apply_window(ofdm.long_training_sequence())
-
         signal = Signal(rate, self._length)
-        signal = encode_signal(signal)
+        signal = bits(encode_signal(signal), gf2=self.gf2)
         signal = self._apply_convolutional_encoder(signal)
         signal = self._interleave(signal, 6)
         signal = self._modulate(signal, 6)
@@ -257,26 +383,34 @@ class Tx:
 
         data = self._encode(x)
         data = self._scramble(data)
-        data = self._apply_convolutional_encoder(data)
-        data = self._puncture(data)
+        data = self._apply_punctured_encoder(data)
         data = self._interleave(data)
         data = self._modulate(data)
         data = self._ofdm_modulate(data)
 
         return np.concatenate(
             [
-                short_training_sequence,
-                long_training_sequence,
+                ofdm.preamble(self.dtype),
                 signal,
                 data,
             ],
         )
 
-    def __init__(self, *, rng: Generator = None):
+    def __init__(
+        self,
+        *,
+        rng: Generator = None,
+        gf2: bool = True,
+        dtype: DTypeLike = np.complex128,
+        fft_backend: Optional[FFTBackend] = None,
+    ):
         if rng is None:
             rng = np.random.default_rng()
 
         self.rng = rng
+        self.gf2 = gf2
+        self.dtype = np.dtype(dtype)
+        self.fft_backend = fft_backend
 
         generator_matrix = poly2matrix(
             GENERATOR_POLYNOMIALS,
@@ -289,10 +423,18 @@ class Tx:
     def _apply_convolutional_encoder(self, x: GF2) -> GF2:
         return self.encoder(x).flatten()
 
+    def _apply_punctured_encoder(self, x: GF2) -> GF2:
+        encoder = PuncturedEncoder(
+            self.encoder.generator_matrix,
+            self._coding_rate,
+        )
+
+        return encoder(x)
+
     def _encode(self, x: ndarray) -> GF2:
-        data = GF2.Zeros(self._n_data)
+        psdu = unpackbits(x, gf2=self.gf2).flatten()
 
-        psdu = unpackbits(x).flatten()
+        data = np.zeros_like(psdu, shape=self._n_data)
 
         data[0:SERVICE_BITS] = ppdu.service()
         data[SERVICE_BITS : -(TAIL_BITS + self._n_pad)] = psdu
@@ -325,20 +467,15 @@ class Tx:
         x = x.reshape(-1, bpsc)
         x = packbits(x)
 
-        return modulate(x, rate)
+        return modulate(x, rate, out=np.empty(x.shape, dtype=self.dtype))
 
     def _ofdm_modulate(self, x: ndarray) -> ndarray:
         x = x.reshape(-1, SUBCARRIERS_DATA)
-        x = ofdm.modulate(x)
+        x = ofdm.modulate(x, backend=self.fft_backend)
         x = add_circular_prefix(x)
 
         return apply_window(x).flatten()
 
-    def _puncture(self, x: GF2) -> GF2:
-        puncturer = Puncturer(self._coding_rate)
-
-        return puncturer.forward(x)
-
     def _scramble(self, x: GF2) -> GF2:
         seed = int(self.rng.integers(1, 1 << (Scrambler.k - 1)))
 
@@ -8,8 +8,10 @@ import pytest
 
 from typing import Final
 
+from galois import GF2
 from numpy.random import Generator
 
+from ofdm import ScipyFFTBackend
 from wifi import (
     Rx,
     Tx,
@@ -45,3 +47,83 @@ def test_wifi(rx: Rx, tx: Tx, data: Data) -> None:
     recieved = rx(signal)
 
     assert np.all(recieved == bits)
+
+
+def test_wifi_stream(rx: Rx, tx: Tx, data: Data) -> None:
+    bits = data.bits
+
+    signal = tx(bits, data.rate)
+
+    recieved = list(rx.stream(signal))
+
+    assert len(recieved) > 1
+    assert np.all(np.concatenate(recieved) == bits)
+
+
+def test_wifi_uint8(data: Data, seed: int) -> None:
+    bits = data.bits
+
+    signal = Tx(rng=np.random.default_rng(seed))(bits, data.rate)
+
+    fast_tx = Tx(rng=np.random.default_rng(seed), gf2=False)
+    fast_rx = Rx(gf2=False)
+
+    assert np.all(fast_tx(bits, data.rate) == signal)
+
+    assert np.all(fast_rx(signal.copy()) == bits)
+    assert np.all(np.concatenate(list(fast_rx.stream(signal))) == bits)
+
+
+def test_wifi_fft_backend(data: Data, seed: int) -> None:
+    bits = data.bits
+
+    backend = ScipyFFTBackend(workers=2)
+
+    signal = Tx(rng=np.random.default_rng(seed))(bits, data.rate)
+
+    tx = Tx(rng=np.random.default_rng(seed), fft_backend=backend)
+    rx = Rx(fft_backend=backend)
+
+    assert np.allclose(tx(bits, data.rate), signal)
+
+    assert np.all(rx(signal) == bits)
+
+
+def test_wifi_single_precision(data: Data, seed: int) -> None:
+    bits = data.bits
+
+    signal = Tx(rng=np.random.default_rng(seed), dtype=np.complex64)(
+        bits,
+        data.rate,
+    )
+
+    assert signal.dtype == np.complex64
+
+    frequency_offset = np.exp(
+        1j * FREQUENCY_OFFSET_ANGLE * np.arange(signal.size)
+    )
+
+    signal *= frequency_offset.astype(np.complex64)
+
+    assert np.all(Rx(dtype=np.complex64)(signal) == bits)
+
+
+def test_wifi_soft(tx: Tx, data: Data) -> None:
+    bits = data.bits
+
+    signal = tx(bits, data.rate)
+
+    frequency_offset = np.exp(
+        1j * FREQUENCY_OFFSET_ANGLE * np.arange(signal.size)
+    )
+
+    signal *= frequency_offset
+
+    recieved = Rx(soft=True)(signal.copy())
+
+    assert np.all(recieved == bits)
+
+    recieved = Rx(gf2=False, soft=True)(signal)
+
+    assert not isinstance(recieved, GF2)
+    assert np.all(recieved == bits)